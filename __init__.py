@@ -46,6 +46,7 @@ from .addon_name import save_addon_name, get_addon_name
 from . import addon_updater_ops
 from .addon_updater import Updater as updater
 from . import bug_reporter
+from .maze_tools import STORAGE_ITEMS
 
 logger = setup_logger(__name__)
 
@@ -168,6 +169,21 @@ class MazeGeneratorPanelMG(Panel):
         box.prop(mg, 'mg_width', slider=False, text="Width")
         box.prop(mg, 'mg_height', slider=False, text="Height")
         box.prop(mg, 'gen_3d_maze', text="Generate 3D Maze")
+        if mg.gen_3d_maze and not mg.tile_based:
+            row = box.row()
+            row.prop(mg, 'mesh_backend', text="Builder")
+            row.active = not mg.merge_quads and not mg.gen_lods
+            row = box.row()
+            row.prop(mg, 'closed_mesh', text="Closed Mesh")
+            row.active = mg.mesh_backend == 'GRID' and not mg.merge_quads and not mg.gen_lods
+            box.prop(mg, 'merge_quads', text="Merge Faces")
+            row = box.row(align=True)
+            row.prop(mg, 'chunked_mesh', text="Chunks")
+            sub = row.row(align=True)
+            sub.active = mg.chunked_mesh
+            sub.prop(mg, 'chunk_size', text="Size")
+            box.prop(mg, 'gen_lods', text="Levels of Detail")
+        box.prop(mg, 'layout_storage', text="Storage")
 
         col = box.box()
 
@@ -180,6 +196,9 @@ class MazeGeneratorPanelMG(Panel):
         row.prop(mg, 'loops_chance', text="Chance")
 
         col.prop(mg, 'algorithm', text="", icon="OOPS")
+        row = col.row(align=True)
+        row.prop(mg, 'seed')
+        row.prop(mg, 'random_seed', text="", icon='FILE_REFRESH')
         if mg.algorithm == 'BINARY_TREE':
             col.prop(mg, 'binary_dir', text="", icon="MOD_DECIM")
             col.prop(mg, 'tileable')
@@ -273,6 +292,13 @@ class MazeTilesPanelMG(Panel):
             sub_box.prop(mg, 'merge_objects', text="Merge Objects")
             if mg.merge_objects:
                 sub_box.prop(mg, 'remove_doubles_merge', text="Remove Doubles")
+                row = sub_box.row(align=True)
+                row.prop(mg, 'chunked_mesh', text="Chunks")
+                sub = row.row(align=True)
+                sub.active = mg.chunked_mesh
+                sub.prop(mg, 'chunk_size', text="Size")
+            else:
+                sub_box.prop(mg, 'instance_tiles', text="Instance Tiles")
 
             row = layout.row()
             row.separator()
@@ -566,6 +592,18 @@ class MazeAddonPrefsMg(AddonPreferences):
 
     preview_samples = IntProperty(name="Samples", default=50, min=1, max=1000)
 
+    use_layout_cache = BoolProperty(
+        name="Cache Layouts",
+        default=True,
+        description="Save generated maze layouts to disk so regenerating with the same settings and seed skips "
+                    "layout generation")
+
+    layout_cache_size = IntProperty(
+        name="Cache Size (MB)",
+        default=256,
+        min=1,
+        description="Delete the least recently used cached layouts when the cache grows over this size")
+
     # addon updater preferences
     auto_check_update = bpy.props.BoolProperty(
         name="Auto-check for Update",
@@ -632,6 +670,13 @@ class MazeAddonPrefsMg(AddonPreferences):
         row.menu('maze_gen.tile_render_menu')
         row.prop(self, 'preview_samples')
 
+        box = layout.box()
+        row = box.row()
+        row.prop(self, 'use_layout_cache')
+        sub = row.row()
+        sub.active = self.use_layout_cache
+        sub.prop(self, 'layout_cache_size')
+
         layout.row()
         # quick help box
         box = layout.box()
@@ -880,15 +925,22 @@ class MazeGenPropertyGroup(PropertyGroup):
     # ---------------------- General Settings -------------------------
 
     mg_width = IntProperty(
-        name="Width", default=25, min=3, max=999)
+        name="Width", default=25, min=3, max=99999, soft_max=999)
 
     mg_height = IntProperty(
-        name="Height", default=25, min=3, max=999)
+        name="Height", default=25, min=3, max=99999, soft_max=999)
 
     gen_3d_maze = BoolProperty(
         name="gen_3d_maze",
         default=True)
 
+    # only the storages this install can use ('ARRAY' needs numpy)
+    layout_storage = EnumProperty(
+        items=STORAGE_ITEMS,
+        name="Layout Storage",
+        description="How the maze layout is stored in memory while generating",
+        default='LIST')
+
     # --------------------------- Tiles -------------------------------
 
     wall_4_sided = StringProperty(
@@ -981,6 +1033,47 @@ class MazeGenPropertyGroup(PropertyGroup):
         default="no_path",
         description="Wall-only (0) tile")
 
+    # ----------------------- Mesh Settings ---------------------------
+
+    mesh_backend = EnumProperty(
+        items=[('CELLS', "Space by Space", "Build the mesh one space at a time"),
+               ('GRID', "NumPy Grid", "Build the mesh from the whole grid at once with NumPy array operations "
+                                      "(much faster for big mazes, needs NumPy)")],
+        name="Mesh Builder",
+        description="How to build the 3D maze mesh (merged faces and levels of detail are always built space by "
+                    "space)",
+        default='CELLS')
+
+    closed_mesh = BoolProperty(
+        name="closed_mesh",
+        default=False,
+        description="Make the NumPy grid mesh a closed solid: outer wall sides, a thin base under the floors, and "
+                    "split corners where walls only touch diagonally. Each chunk is closed on its own, so chunks "
+                    "have faces against each other at their seams")
+
+    merge_quads = BoolProperty(
+        name="merge_quads",
+        default=False,
+        description="Merge neighboring floors, wall tops, and wall sides into as few faces as possible")
+
+    chunked_mesh = BoolProperty(
+        name="chunked_mesh",
+        default=False,
+        description="Split the 3D maze (or merged tile maze) into one object per chunk of spaces")
+
+    chunk_size = IntProperty(
+        name="chunk_size",
+        default=128,
+        min=8,
+        soft_max=1024,
+        description="Width and height of each chunk in spaces")
+
+    gen_lods = BoolProperty(
+        name="gen_lods",
+        default=False,
+        description="Also make full, merged, and heightfield (floors and tops only) meshes of the maze (or each "
+                    "chunk) and keep them as alternate mesh datablocks")
+
     # ----------------------- Tile Settings ---------------------------
 
     tile_based = BoolProperty(
@@ -999,7 +1092,10 @@ class MazeGenPropertyGroup(PropertyGroup):
 
     merge_objects = BoolProperty(
         name="merge_objects",
-        default=True)
+        default=True,
+        description="Write every tile into one mesh object. The merged mesh keeps each tile's materials, smooth "
+                    "shading, edge flags, and active UV map. Tiles with vertex groups, shape keys, vertex colors, "
+                    "or extra UV maps are copied then joined instead (slower, and never split into chunks)")
 
     remove_doubles_merge = BoolProperty(
         name="remove_doubles_merge",
@@ -1009,6 +1105,12 @@ class MazeGenPropertyGroup(PropertyGroup):
         name="apply_modifiers",
         default=True)
 
+    instance_tiles = BoolProperty(
+        name="instance_tiles",
+        default=False,
+        description="Place linked instances of each tile (one dupliverts object per tile and rotation) instead of "
+                    "a full copy of the tile on every space. Only used when not merging objects")
+
     tiles = EnumProperty(name="Tile", items=enum_previews_from_directory)
 
     tile_importer = BoolProperty(name="Tile Importer", default=False)
@@ -1084,6 +1186,18 @@ class MazeGenPropertyGroup(PropertyGroup):
         min=0,
         max=1)
 
+    seed = IntProperty(
+        name="Seed",
+        default=0,
+        min=0,
+        description="Random seed for the layout; the same settings and seed always make the same maze")
+
+    random_seed = BoolProperty(
+        name="Random Seed",
+        default=True,
+        description="Pick a new seed every time a maze is generated (the seed used is written back to Seed, so turn "
+                    "this off to make the same maze again)")
+
     # ----------------------- Batch Tools -----------------------------
 
     num_batch_mazes = IntProperty(
@@ -32,13 +32,14 @@ from . import maze_tools
 from .addon_name import get_addon_name
 
 
-def add_loops(maze):
+def add_loops(maze, rng=random):
     """Adds the ability to walk in circles by removing walls.
 
     Args:
         maze - python list in the format:
             [[(space in maze - x, y), is path, is walkable, active path],
             [(space in maze - x, y), is path, is walkable, active path], ...]
+        rng - (random.Random) random number generator to use, the random module by default
 
     Returns:
         updated maze
@@ -48,15 +49,18 @@ def add_loops(maze):
         for column in range(maze.height):
             directions = maze.find_touching_path_dirs(row, column)
             if directions == ['N', 'S'] or directions == ['W', 'E']:
-                random_num = random.randint(1, chance)
+                random_num = rng.randint(1, chance)
                 if random_num == 1:
                     maze.make_path(row, column)
     return maze
 
 
-def make_list_maze():
+def make_list_maze(rng=None):
     """Constructs a python list maze based on maze gen settings.
 
+    Args:
+        rng - (random.Random) random number generator to use, a new one seeded with mg.seed by default
+
     Returns:
         maze - python list in the format:
             [[(space in maze - x, y), is path],
@@ -67,11 +71,15 @@ def make_list_maze():
     x_dim = mg.mg_width
     y_dim = mg.mg_height
     debug = bpy.context.user_preferences.addons[get_addon_name()].preferences.debug_mode
+    if rng is None:
+        rng = random.Random(mg.seed)
 
     if mg.algorithm == 'BREADTH_FIRST':
         m = maze_tools.BreadthFirstMaze(debug=debug,
                                         width=x_dim,
                                         height=y_dim,
+                                        storage=mg.layout_storage,
+                                        rng=rng,
                                         bias_direction=mg.bias_direction,
                                         bias=mg.bias)
 
@@ -79,6 +87,8 @@ def make_list_maze():
         m = maze_tools.DepthFirstMaze(debug=debug,
                                       width=x_dim,
                                       height=y_dim,
+                                      storage=mg.layout_storage,
+                                      rng=rng,
                                       bias_direction=mg.bias_direction,
                                       bias=mg.bias)
 
@@ -86,6 +96,8 @@ def make_list_maze():
         m = maze_tools.PrimsMaze(debug=debug,
                                  width=x_dim,
                                  height=y_dim,
+                                 storage=mg.layout_storage,
+                                 rng=rng,
                                  bias_direction=mg.bias_direction,
                                  bias=mg.bias)
 
@@ -93,18 +105,25 @@ def make_list_maze():
         m = maze_tools.BinaryTreeMaze(debug=debug,
                                       width=x_dim,
                                       height=y_dim,
+                                      storage=mg.layout_storage,
+                                      rng=rng,
                                       directions=mg.binary_dir,
-                                      tileable=mg.tileable)
+                                      tileable=mg.tileable,
+                                      vectorized=True)
 
     elif mg.algorithm == 'KRUSKALS':
         m = maze_tools.KruskalsMaze(debug=debug,
                                     width=x_dim,
-                                    height=y_dim)
+                                    height=y_dim,
+                                    storage=mg.layout_storage,
+                                    rng=rng)
 
     elif mg.algorithm == 'ELLERS':
         m = maze_tools.EllersMaze(debug=debug,
                                   width=x_dim,
                                   height=y_dim,
+                                  storage=mg.layout_storage,
+                                  rng=rng,
                                   bias=mg.bias)
 
     maze = m.get()
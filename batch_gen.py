@@ -84,6 +84,10 @@ def load_batch_settings(context, maze_setup):
             mg.tileable = bool(int(parts[1]))
         elif parts[0] == 'bi':
             mg.bias = float(parts[1])
+        elif parts[0] == 'sd':
+            mg.seed = int(parts[1])
+        elif parts[0] == 'rs':
+            mg.random_seed = bool(int(parts[1]))
 
         # tile settings
         elif parts[0] == "tb":
@@ -150,7 +154,7 @@ class StoreBatchMazeMG(bpy.types.Operator):
         mg = context.scene.mg
         settings_text = (" && wd,{};ht,{};3d,{};al,{};lc,{};"
                          "fl,{};lm,{};wl,{};"
-                         "ag,{};br,{};bd,{};ti,{};bi,{};"
+                         "ag,{};br,{};bd,{};ti,{};bi,{};sd,{};rs,{};"
                          "tb,{};im,{};mo,{};am,{};rd,{};"
                          "w0,{};w1,{};w2,{};w3,{};w4,{};wc,{};"
                          "f0,{};f1,{};f2,{};f3,{};f4,{};fc,{};"
@@ -168,6 +172,8 @@ class StoreBatchMazeMG(bpy.types.Operator):
                             mg.binary_dir,
                             int(mg.tileable),
                             mg.bias,
+                            mg.seed,
+                            int(mg.random_seed),
                             int(mg.tile_based),
                             int(mg.import_mat),
                             int(mg.merge_objects),
@@ -17,109 +17,175 @@
 # along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
 # ##### END GPL LICENSE BLOCK #####
 
+from time import time
+
 import bpy
-import bmesh
 
 from .progress_display import BlenderProgress
+from . import mesh_tools
+from .mesh_tools import maze_quads, maze_lods, grid_quads, chunk_ranges, quad_loops
 from .addon_name import get_addon_name
+from .logging_setup import setup_logger
 
+logger = setup_logger(__name__)
 
-def quad_mesh_builder(verts, faces):
-    me = bpy.data.meshes.new("mesh")
-    ob = bpy.data.objects.new("Maze", me)
 
-    scn = bpy.context.scene
-    scn.objects.link(ob)
-    scn.objects.active = ob
-    ob.select = True
+def quad_mesh_data(coords, quads, name="mesh"):
+    """Returns a new mesh datablock of quads, loading all of the mesh data in bulk.
 
-    me = bpy.context.object.data
-    bm = bmesh.new()
+    Args:
+        coords - (array of floats) flat vertex coordinates: x, y, z, x, y, z...
+        quads - (array of ints) flat vertex indices, 4 per quad
+        name - (string) name of the mesh
+    """
+    time_start = time()
 
-    bverts = []
-    for v in verts:
-        bverts.append(bm.verts.new(v))
+    num_verts = len(coords) // 3
+    num_loops = len(quads)
+    num_quads = num_loops // 4
 
-    for f in faces:
-        bm.faces.new([bverts[f[0]], bverts[f[1]], bverts[f[2]], bverts[f[3]]])
+    me = bpy.data.meshes.new(name)
+    me.vertices.add(num_verts)
+    me.loops.add(num_loops)
+    me.polygons.add(num_quads)
 
-    # Finish up, write the bmesh back to the mesh
-    bm.to_mesh(me)
-    bm.free()  # free and prevent further access
+    me.vertices.foreach_set("co", coords)
+    me.loops.foreach_set("vertex_index", quads)
+    loop_start, loop_total = quad_loops(num_quads)
+    me.polygons.foreach_set("loop_start", loop_start)
+    me.polygons.foreach_set("loop_total", loop_total)
 
+    me.update(calc_edges=True)
 
-class Make3DMaze:
-    def __init__(self, maze):
-        self.verts = []
-        self.faces = []
+    logger.debug("Built {} verts and {} quads in {:.3f}s".format(num_verts, num_quads, time() - time_start))
+    return me
 
-        self.make_3dmaze(maze)
 
-    def add_hor_plane(self, x, y, z):
-        vert_ind = len(self.verts)
-        self.verts.append((x - 0.5, -(y + 0.5), z))
-        self.verts.append((x + 0.5, -(y + 0.5), z))
-        self.verts.append((x + 0.5, -(y - 0.5), z))
-        self.verts.append((x - 0.5, -(y - 0.5), z))
+def quad_mesh_builder(coords, quads, name="Maze"):
+    """Makes a new object of quads linked to the scene (see quad_mesh_data).
 
-        self.faces.append([vert_ind, vert_ind + 1, vert_ind + 2, vert_ind + 3])
+    Returns:
+        the new object
+    """
+    ob = bpy.data.objects.new(name, quad_mesh_data(coords, quads))
 
-    def make_3dmaze(self, maze):
-        """Makes basic 3D maze from python list."""
+    scn = bpy.context.scene
+    scn.objects.link(ob)
+    scn.objects.active = ob
+    ob.select = True
 
-        debug = bpy.context.user_preferences.addons[get_addon_name()].preferences.debug_mode
+    return ob
 
-        bldr_prog = BlenderProgress("3D Maze Gen", debug)
-        bldr_prog.start()
-        maze_length = len(maze)
 
-        loops = 0
+def remove_unused_lods():
+    """Removes alternate LOD meshes whose maze object was deleted.
+
+    build_chunk gives the alternate LOD meshes a fake user (nothing else uses them) and lists their names in the
+    object's "maze_lods" property, so once no object in a scene lists a mesh, the mesh is only kept alive by its fake
+    user and can be removed.
+
+    Returns:
+        (int) number of meshes removed
+    """
+    listed = set()
+    for ob in bpy.data.objects:
+        if ob.users:
+            listed.update(ob.get("maze_lods", ()))
 
-        # iterate over every space in the maze
-        for x in range(maze.width):
-            for y in range(maze.height):
-                if maze.is_path(x, y):
-                    self.add_hor_plane(x, y, 0)
+    removed = 0
+    for me in list(bpy.data.meshes):
+        if me.get("MazeLOD") and me.name not in listed and me.users <= 1:
+            bpy.data.meshes.remove(me)
+            removed += 1
 
-                else:
-                    self.add_hor_plane(x, y, 1)
+    if removed:
+        logger.debug("Removed {} unused LOD meshes".format(removed))
+    return removed
 
-                    for i, d in enumerate(maze.find_touching(x, y)):
-                        if maze.exist_test(d[0], d[1]):
-                            if maze.is_path(d[0], d[1]):
-                                # check for on x-axis!...y-axis
-                                if d[0] == x:
-                                    y_avg = -((d[1] + y) / 2)
-                                    vert_ind = len(self.verts)
 
-                                    self.verts.append((d[0] - 0.5, y_avg, 1))
-                                    self.verts.append((d[0] + 0.5, y_avg, 1))
-                                    self.verts.append((d[0] + 0.5, y_avg, 0))
-                                    self.verts.append((d[0] - 0.5, y_avg, 0))
+class Make3DMaze:
+    def __init__(self, maze):
+        self.make_3dmaze(maze)
+
+    @staticmethod
+    def build_chunk(maze, region, merge=False, lods=False, name="Maze", backend='CELLS', paths=None, closed=False):
+        """Builds one maze object for the (x0, y0, x1, y1) region of the maze.
+
+        Chunks only depend on the maze and their region, so any chunk can be rebuilt on its own.
+
+        Args:
+            maze - maze to build
+            region - (tuple) (x0, y0, x1, y1) part of the maze to build
+            merge - (bool) merge coplanar neighboring quads
+            lods - (bool) also store every level of detail as a mesh datablock named '<object>.lod_<level>', the
+                   alternate ones are listed in the object's "maze_lods" property (see remove_unused_lods)
+            name - (string) name of the object
+            backend - (string) 'CELLS' to build space by space, 'GRID' to build with numpy array operations (only
+                      used without merge and lods)
+            paths - (numpy bool array) optional path mask of the whole maze for the 'GRID' backend, so building
+                    every chunk doesn't convert the whole maze again (see mesh_tools.grid_quads)
+            closed - (bool) make a closed manifold mesh with the 'GRID' backend (see mesh_tools.grid_quads)
+
+        Returns:
+            the new object
+        """
+        if backend == 'GRID' and not merge and not lods:
+            coords, quads = grid_quads(maze, region, paths=paths, closed=closed)
+            return quad_mesh_builder(coords, quads, name)
+
+        if not lods:
+            mesh = maze_quads(maze, merge=merge, region=region)
+            return quad_mesh_builder(mesh.coords, mesh.quads, name)
+
+        meshes = maze_lods(maze, region=region)
+        lod = 'MERGED' if merge else 'FULL'
+        ob = quad_mesh_builder(meshes[lod].coords, meshes[lod].quads, name)
+        ob.data.name = "{}.lod_{}".format(ob.name, lod.lower())
+
+        alternates = []
+        for other_lod, mesh in meshes.items():
+            if other_lod != lod:
+                me = quad_mesh_data(mesh.coords, mesh.quads, "{}.lod_{}".format(ob.name, other_lod.lower()))
+                # keep the alternate meshes while nothing uses them, until their object is gone
+                me.use_fake_user = True
+                me["MazeLOD"] = True
+                alternates.append(me.name)
+        ob["maze_lods"] = alternates
+        return ob
 
-                                    self.faces.append([vert_ind, vert_ind + 1, vert_ind + 2, vert_ind + 3])
+    def make_3dmaze(self, maze):
+        """Makes basic 3D maze from python list."""
 
-                                else:
-                                    x_avg = (d[0] + x) / 2
-                                    vert_ind = len(self.verts)
+        debug = bpy.context.user_preferences.addons[get_addon_name()].preferences.debug_mode
+        mg = bpy.context.scene.mg
 
-                                    self.verts.append((x_avg, -(d[1] - 0.5), 1))
-                                    self.verts.append((x_avg, -(d[1] + 0.5), 1))
-                                    self.verts.append((x_avg, -(d[1] + 0.5), 0))
-                                    self.verts.append((x_avg, -(d[1] - 0.5), 0))
+        backend = mg.mesh_backend
+        if backend == 'GRID' and mesh_tools.np is None:
+            logger.warning("NumPy is not available...building the maze space by space")
+            backend = 'CELLS'
 
-                                    self.faces.append([vert_ind, vert_ind + 1, vert_ind + 2, vert_ind + 3])
+        # alternate LODs of mazes that have since been deleted
+        remove_unused_lods()
 
-                progress = loops / maze_length
-                bldr_prog.update(progress)
+        bldr_prog = BlenderProgress("3D Maze Gen", debug)
+        bldr_prog.start()
 
-        quad_mesh_builder(self.verts, self.faces)
+        if mg.chunked_mesh:
+            # the maze is converted to a path mask once and every chunk reads its slice of it
+            paths = None
+            if backend == 'GRID' and not mg.merge_quads and not mg.gen_lods:
+                paths = maze.as_array() != 0
+
+            chunks = list(chunk_ranges(maze.width, maze.height, mg.chunk_size))
+            for i, region in enumerate(chunks):
+                bldr_prog.update(i / len(chunks))
+                name = "Maze.chunk_{}_{}".format(region[0] // mg.chunk_size, region[1] // mg.chunk_size)
+                self.build_chunk(maze, region, mg.merge_quads, mg.gen_lods, name, backend, paths, mg.closed_mesh)
+        elif mg.gen_lods or (backend == 'GRID' and not mg.merge_quads):
+            self.build_chunk(maze, (0, 0, maze.width, maze.height), mg.merge_quads, mg.gen_lods, backend=backend,
+                             closed=mg.closed_mesh)
+        else:
+            mesh = maze_quads(maze, bldr_prog.update, merge=mg.merge_quads)
+            quad_mesh_builder(mesh.coords, mesh.quads)
 
         bldr_prog.finish()
-
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.remove_doubles()
-        bpy.ops.mesh.normals_make_consistent(inside=True)
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.object.mode_set(mode='OBJECT')
@@ -0,0 +1,91 @@
+# Copyright 2017 Integrity Software and Games, LLC
+#
+# ##### BEGIN GPL LICENSE BLOCK ######
+# This file is part of UltiMaze.
+#
+# UltiMaze is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# UltiMaze is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Converts between flat RGBA pixel buffers and text mazes without touching bpy.
+
+Blender stores image rows bottom to top while text mazes are written top to bottom, so rows are flipped both ways.
+
+Available Functions:
+    pixels_to_text - Returns the text maze ("1" paths, "0" walls) of an RGBA pixel buffer
+    text_to_pixels - Returns the RGBA pixel buffer of a text maze
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def pixels_to_text(pixels, width, height):
+    """Returns the text maze ("1" paths, "0" walls) of an RGBA pixel buffer.
+
+    A pixel is a path if its red channel is > 0.5. With numpy the whole buffer is thresholded at once and the rows
+    are flipped with a negative stride view instead of being copied one by one.
+
+    Args:
+        pixels - (sequence of floats) width * height * 4 RGBA values, rows bottom to top (like image.pixels)
+        width - (int) width of the image in pixels
+        height - (int) height of the image in pixels
+
+    Returns:
+        (string) width * height characters, rows top to bottom
+    """
+    if np is not None:
+        red = np.asarray(pixels, dtype=np.float32)[0::4].reshape(height, width)
+        # one byte per pixel, ord("0") or ord("1"), rows flipped by the [::-1] view
+        chars = (red[::-1] > 0.5).astype(np.uint8) + ord("0")
+        return chars.tobytes().decode('ascii')
+
+    red = pixels[0::4]
+    rows = []
+    for row in range(height - 1, -1, -1):
+        rows.append("".join("1" if value > 0.5 else "0" for value in red[row * width:(row + 1) * width]))
+    return "".join(rows)
+
+
+def text_to_pixels(text, width, height):
+    """Returns the RGBA pixel buffer of a text maze.
+
+    Paths ("1") are white and everything else is black (0, 0, 0, 1), like a new image. With numpy the buffer is built
+    from the text's bytes in one go and the rows are flipped with a negative stride view.
+
+    Args:
+        text - (string) width * height characters, rows top to bottom
+        width - (int) width of the image in pixels
+        height - (int) height of the image in pixels
+
+    Returns:
+        width * height * 4 RGBA values, rows bottom to top (float32 numpy array or list of floats), ready to be
+        assigned to image.pixels at once
+    """
+    if np is not None:
+        paths = np.frombuffer(text.encode('ascii', 'replace'), dtype=np.uint8).reshape(height, width) == ord("1")
+        pixels = np.empty((height, width, 4), dtype=np.float32)
+        pixels[:, :, :3] = paths[::-1, :, None]
+        pixels[:, :, 3] = 1
+        return pixels.ravel()
+
+    path = [1.0, 1.0, 1.0, 1.0]
+    wall = [0.0, 0.0, 0.0, 1.0]
+    pixels = []
+    for row in range(height - 1, -1, -1):
+        for char in text[row * width:(row + 1) * width]:
+            pixels.extend(path if char == "1" else wall)
+    return pixels
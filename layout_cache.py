@@ -0,0 +1,205 @@
+# Copyright 2017 Integrity Software and Games, LLC
+#
+# ##### BEGIN GPL LICENSE BLOCK ######
+# This file is part of UltiMaze.
+#
+# UltiMaze is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# UltiMaze is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+On-disk cache of maze layouts, keyed by a hash of the settings that made them.
+
+Layouts are stored bit-packed (see maze_tools.BitMaze) behind a small header. The least recently used layouts are
+deleted when the cache grows over its size cap.
+
+Available Functions:
+    layout_key - Returns the cache key for a dict of layout settings
+    pack_layout - Returns a maze as compact binary data
+    unpack_layout - Returns the maze stored in binary data made by pack_layout
+    load_layout - Returns the cached maze for a key, or None if it isn't cached
+    store_layout - Writes a maze to the cache, then evicts old layouts over the size cap
+    evict - Deletes the least recently used layouts until the cache fits in max_bytes
+"""
+
+IN_BLENDER = True
+
+import hashlib
+import os
+import struct
+
+if IN_BLENDER:
+    from .maze_tools import BitMaze, convert_maze
+    from .logging_setup import setup_logger
+else:
+    from maze_tools import BitMaze, convert_maze
+    from logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+CACHE_FOLDER = os.path.join(os.path.dirname(__file__), "settings", "layout_cache")
+EXTENSION = ".maze"
+
+# bump the version when a generator changes what it makes for the same settings and seed
+CACHE_VERSION = 1
+
+# magic, width, height
+HEADER = struct.Struct("<4sII")
+MAGIC = b"UMZ1"
+
+
+def layout_key(settings):
+    """Returns the cache key for a dict of layout settings.
+
+    Args:
+        settings - dict of everything that affects the layout (algorithm, dimensions, bias, loops, seed...)
+
+    Returns:
+        (string) hex digest that only depends on the settings' names and values, not their order
+    """
+    text = ";".join("{},{!r}".format(name, settings[name]) for name in sorted(settings))
+    text = "v{};{}".format(CACHE_VERSION, text)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def pack_layout(maze):
+    """Returns a maze as compact binary data (a header and one bit per space)."""
+    bits = convert_maze(maze, 'BITS')
+    return HEADER.pack(MAGIC, maze.width, maze.height) + bytes(bits.maze)
+
+
+def unpack_layout(data, storage='BITS'):
+    """Returns the maze stored in binary data made by pack_layout.
+
+    Args:
+        data - (bytes) binary data from pack_layout
+        storage - (string) key in maze_tools.MAZE_STORAGE for the returned maze
+
+    Returns:
+        maze, or None if the data is not a valid layout
+    """
+    if len(data) < HEADER.size:
+        return None
+
+    magic, width, height = HEADER.unpack_from(data)
+    bits = data[HEADER.size:]
+    if magic != MAGIC or len(bits) != (width * height + 7) >> 3:
+        return None
+
+    maze = BitMaze(width, height)
+    maze.maze = bytearray(bits)
+    return convert_maze(maze, storage)
+
+
+def layout_path(key, folder):
+    return os.path.join(folder, key + EXTENSION)
+
+
+def load_layout(key, folder=CACHE_FOLDER, storage='BITS'):
+    """Returns the cached maze for a key, or None if it isn't cached.
+
+    Args:
+        key - (string) key from layout_key
+        folder - (string) cache folder
+        storage - (string) key in maze_tools.MAZE_STORAGE for the returned maze
+    """
+    path = layout_path(key, folder)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    maze = unpack_layout(data, storage)
+    if maze is None:
+        logger.warning("Cached layout {} is corrupt...ignoring it".format(path))
+        return None
+
+    # mark as recently used for evict()...a read-only cache still hits, it just can't track use
+    try:
+        os.utime(path)
+    except OSError as e:
+        logger.debug("Couldn't mark cached layout {} as used: {}".format(path, e))
+    logger.debug("Loaded cached layout {}".format(path))
+    return maze
+
+
+def store_layout(key, maze, folder=CACHE_FOLDER, max_bytes=256 * 1024 * 1024):
+    """Writes a maze to the cache, then evicts old layouts over the size cap.
+
+    The cache is only an optimization, so a folder that can't be written to (read-only install, full disk...) is
+    logged and otherwise ignored.
+
+    Args:
+        key - (string) key from layout_key
+        maze - maze to store
+        folder - (string) cache folder
+        max_bytes - (int) size cap of the whole cache
+
+    Returns:
+        (bool) whether the layout was stored
+    """
+    # write to a temp file first so a crash never leaves a half-written layout behind
+    path = layout_path(key, folder)
+    temp_path = path + ".tmp"
+    try:
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(temp_path, "wb") as f:
+            f.write(pack_layout(maze))
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning("Couldn't store layout {} in the layout cache: {}".format(path, e))
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        return False
+    logger.debug("Stored layout {}".format(path))
+
+    try:
+        evict(folder, max_bytes)
+    except OSError as e:
+        logger.warning("Couldn't evict old layouts from the layout cache: {}".format(e))
+    return True
+
+
+def evict(folder=CACHE_FOLDER, max_bytes=256 * 1024 * 1024):
+    """Deletes the least recently used layouts until the cache fits in max_bytes.
+
+    Returns:
+        (list of strings) keys of the deleted layouts
+    """
+    if not os.path.exists(folder):
+        return []
+
+    layouts = []
+    for filename in os.listdir(folder):
+        if filename.endswith(EXTENSION):
+            stat = os.stat(os.path.join(folder, filename))
+            layouts.append((stat.st_mtime, stat.st_size, filename))
+
+    # keep the most recently used ones that fit
+    layouts.sort(reverse=True)
+    total = 0
+    evicted = []
+    for mtime, size, filename in layouts:
+        total += size
+        if total > max_bytes:
+            os.remove(os.path.join(folder, filename))
+            evicted.append(filename[:-len(EXTENSION)])
+
+    if evicted:
+        logger.debug("Evicted {} cached layouts from {}".format(len(evicted), folder))
+    return evicted
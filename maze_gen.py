@@ -17,6 +17,7 @@
 # along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
 # ##### END GPL LICENSE BLOCK #####
 
+import random
 from time import time
 
 import bpy
@@ -26,6 +27,7 @@ from . import txt_img_converter
 from . import auto_layout_gen
 from . import tile_maze_gen
 from . import time_log
+from . import layout_cache
 from .bmesh_maze_gen import Make3DMaze
 from .time_display import TimeDisplay
 from .addon_name import get_addon_name
@@ -39,6 +41,38 @@ def morph_dimensions():
         mg.mg_height += 1
 
 
+def layout_settings(mg):
+    """Returns a dict of every setting that affects the generated layout (the layout cache's key)."""
+    return {'algorithm': mg.algorithm,
+            'width': mg.mg_width,
+            'height': mg.mg_height,
+            'bias': round(mg.bias, 6),
+            'bias_direction': mg.bias_direction,
+            'binary_dir': mg.binary_dir,
+            'tileable': mg.tileable,
+            'allow_loops': mg.allow_loops,
+            'loops_chance': mg.loops_chance if mg.allow_loops else None,
+            'seed': mg.seed}
+
+
+def make_layout(mg, rng, addon_prefs):
+    """Returns the layout for the current settings, from the layout cache if it has already been generated."""
+    if not addon_prefs.use_layout_cache:
+        maze = auto_layout_gen.make_list_maze(rng)
+        if mg.allow_loops:
+            maze = auto_layout_gen.add_loops(maze, rng)
+        return maze
+
+    key = layout_cache.layout_key(layout_settings(mg))
+    maze = layout_cache.load_layout(key, storage=mg.layout_storage)
+    if maze is None:
+        maze = auto_layout_gen.make_list_maze(rng)
+        if mg.allow_loops:
+            maze = auto_layout_gen.add_loops(maze, rng)
+        layout_cache.store_layout(key, maze, max_bytes=addon_prefs.layout_cache_size * 1024 * 1024)
+    return maze
+
+
 def make_maze(context):
     """
     Makes a maze based on the settings specified in the UI.
@@ -101,13 +135,18 @@ def make_maze(context):
     if mg.gen_3d_maze or mg.write_list_maze:
         if addon_prefs.only_odd_sizes:
             morph_dimensions()
+
+        # one random stream per maze so the same settings and seed always make the same layout
+        if mg.random_seed:
+            mg.seed = random.randint(0, 2 ** 31 - 1)
+        rng = random.Random(mg.seed)
+
         if mg.use_list_maze:
             maze = txt_img_converter.convert_list_maze()
+            if mg.allow_loops:
+                maze = auto_layout_gen.add_loops(maze, rng)
         else:
-            maze = auto_layout_gen.make_list_maze()
-
-        if mg.allow_loops:
-            maze = auto_layout_gen.add_loops(maze)
+            maze = make_layout(mg, rng, addon_prefs)
 
         # 3D generation
         if mg.gen_3d_maze:
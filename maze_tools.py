@@ -20,15 +20,22 @@
 IN_BLENDER = True
 
 import random
+import sys
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 if IN_BLENDER:
     from . import weira
-    from .trees import Tree
+    from .trees import DisjointSet
     from .progress_display import BlenderProgress
     from .logging_setup import setup_logger
 else:
     import weira
-    from trees import Tree
+    from trees import DisjointSet
     from time import sleep
     from logging_setup import setup_logger
 
@@ -47,6 +54,23 @@ def find_all(lst, value):
     return [i for i, a in enumerate(lst) if a == value]
 
 
+# bits of a neighbor mask, same order as find_touching_path_dirs
+DIR_BITS = {'N': 1, 'W': 2, 'E': 4, 'S': 8}
+
+
+def dirs_to_mask(directions):
+    """Returns the neighbor mask for a list of directions ('N', 'W', 'E', 'S')."""
+    mask = 0
+    for d in directions:
+        mask |= DIR_BITS[d]
+    return mask
+
+
+def mask_to_dirs(mask):
+    """Returns the list of directions (in order N, W, E, S) set in a neighbor mask."""
+    return [d for d in ('N', 'W', 'E', 'S') if mask & DIR_BITS[d]]
+
+
 class Maze:
     """The wrapper object for storing a maze.
 
@@ -54,6 +78,7 @@ class Maze:
         __init__ - Sets up maze, width, and height, then calls make_base_grid to setup grid.
         __len__ - Override for python len().
         make_base_grid - Sets up self.maze with grid based on x and y dimensions.
+        size_in_bytes - Returns the approximate number of bytes used to store the grid.
         get_maze - Returns maze.
         is_path - Returns if space defined by x and y is a path.
         make_path - Makes the space defined by x and y a path.
@@ -62,6 +87,9 @@ class Maze:
         exist_test - Checks if ordered pair exists within maze size.
         find_touching_path_dirs - Returns the directions in which there is a path adjacent to space (x, y), separated by given distance.
         find_exist_touching - Finds the spaces that touch x and y separated by 'dist'.
+        as_array - Returns the grid as a (width, height) numpy array of 0s and 1s.
+        load_array - Replaces the grid with the values of a (width, height) numpy array.
+        neighbor_mask - Returns a (width, height) numpy array of N/W/E/S path bits for every space.
     """
     def __init__(self, width, height, walls=True):
         """Sets up maze, width, and height, then calls make_base_grid to setup grid."""
@@ -81,13 +109,12 @@ class Maze:
         Args:
             walls - make all spaces in the grid walls, False = make all spaces paths
         """
-        for column in range(0, self.width):
-            self.maze.append([])
-            for row in range(0, self.height):
-                if walls:
-                    self.maze[column].append(0)
-                else:
-                    self.maze[column].append(1)
+        value = 0 if walls else 1
+        self.maze = [[value] * self.height for _ in range(self.width)]
+
+    def size_in_bytes(self):
+        """Returns the approximate number of bytes used to store the grid."""
+        return sys.getsizeof(self.maze) + sum(sys.getsizeof(column) for column in self.maze)
 
     def get_maze(self):
         """Returns maze."""
@@ -203,6 +230,254 @@ class Maze:
 
         return touching_xy
 
+    def as_array(self):
+        """Returns the grid as a (width, height) numpy array of 0s and 1s."""
+        return np.array(self.maze, dtype=np.uint8)
+
+    def load_array(self, grid):
+        """Replaces the grid with the values of a (width, height) numpy array."""
+        self.maze = grid.astype(np.uint8).tolist()
+
+    def neighbor_mask(self, dist=1):
+        """Returns a (width, height) numpy array of N/W/E/S path bits for every space.
+
+        This is the whole-grid version of find_touching_path_dirs: bit DIR_BITS[d] of
+        mask[x, y] is set if there is a path in direction d separated by 'dist'.
+
+        Args:
+            dist - (int) the distance from each space to check if the space is a path
+
+        Returns:
+            (numpy array of uint8) neighbor masks indexed [x, y]
+        """
+        paths = self.as_array() != 0
+        mask = np.zeros((self.width, self.height), dtype=np.uint8)
+
+        if dist < self.height:
+            # N = (x, y + dist), S = (x, y - dist)
+            mask[:, :self.height - dist][paths[:, dist:]] |= DIR_BITS['N']
+            mask[:, dist:][paths[:, :self.height - dist]] |= DIR_BITS['S']
+        if dist < self.width:
+            # W = (x - dist, y), E = (x + dist, y)
+            mask[dist:, :][paths[:self.width - dist, :]] |= DIR_BITS['W']
+            mask[:self.width - dist, :][paths[dist:, :]] |= DIR_BITS['E']
+
+        return mask
+
+
+class ByteMaze(Maze):
+    """Maze stored in a flat bytearray (1 byte per space, column-major like Maze).
+
+    Methods:
+        __len__ - Override for python len().
+        make_base_grid - Sets up self.maze as a flat bytearray.
+        size_in_bytes - Returns the approximate number of bytes used to store the grid.
+        get_maze - Returns maze as a list of columns (same format as Maze.get_maze).
+        is_path - Returns if space defined by x and y is a path.
+        make_path - Makes the space defined by x and y a path.
+        make_wall - Makes the space defined by x and y a wall.
+        as_array - Returns the grid as a (width, height) numpy array (a view of the bytearray).
+        load_array - Replaces the grid with the values of a (width, height) numpy array.
+    """
+    def __len__(self):
+        """Override for python len()."""
+        return self.width
+
+    def make_base_grid(self, walls):
+        """Sets up self.maze as a flat bytearray.
+
+        Args:
+            walls - make all spaces in the grid walls, False = make all spaces paths
+        """
+        self.maze = bytearray(self.width * self.height)
+        if not walls:
+            self.maze = bytearray(b'\x01') * (self.width * self.height)
+
+    def size_in_bytes(self):
+        """Returns the approximate number of bytes used to store the grid."""
+        return sys.getsizeof(self.maze)
+
+    def get_maze(self):
+        """Returns maze as a list of columns (same format as Maze.get_maze)."""
+        h = self.height
+        return [list(self.maze[x * h:x * h + h]) for x in range(self.width)]
+
+    def is_path(self, x, y):
+        """Returns if space defined by x and y is a path."""
+        return self.maze[x * self.height + y]
+
+    def make_path(self, x, y):
+        """Makes the space defined by x and y a path."""
+        self.maze[x * self.height + y] = 1
+
+    def make_wall(self, x, y):
+        """Makes the space defined by x and y a wall."""
+        self.maze[x * self.height + y] = 0
+
+    def as_array(self):
+        """Returns the grid as a (width, height) numpy array (a view of the bytearray)."""
+        return np.frombuffer(self.maze, dtype=np.uint8).reshape(self.width, self.height)
+
+    def load_array(self, grid):
+        """Replaces the grid with the values of a (width, height) numpy array."""
+        self.maze = bytearray((grid != 0).astype(np.uint8).tobytes())
+
+
+class BitMaze(Maze):
+    """Maze packed into a bytearray (1 bit per space, column-major, most significant bit first).
+
+    Methods:
+        __len__ - Override for python len().
+        make_base_grid - Sets up self.maze as a packed bytearray.
+        size_in_bytes - Returns the approximate number of bytes used to store the grid.
+        get_maze - Returns maze as a list of columns (same format as Maze.get_maze).
+        is_path - Returns if space defined by x and y is a path.
+        make_path - Makes the space defined by x and y a path.
+        make_wall - Makes the space defined by x and y a wall.
+        as_array - Returns the grid as a (width, height) numpy array of 0s and 1s.
+        load_array - Replaces the grid with the values of a (width, height) numpy array.
+    """
+    def __len__(self):
+        """Override for python len()."""
+        return self.width
+
+    def make_base_grid(self, walls):
+        """Sets up self.maze as a packed bytearray.
+
+        Args:
+            walls - make all spaces in the grid walls, False = make all spaces paths
+        """
+        num_bytes = (self.width * self.height + 7) >> 3
+        if walls:
+            self.maze = bytearray(num_bytes)
+        else:
+            self.maze = bytearray(b'\xff') * num_bytes
+
+    def size_in_bytes(self):
+        """Returns the approximate number of bytes used to store the grid."""
+        return sys.getsizeof(self.maze)
+
+    def get_maze(self):
+        """Returns maze as a list of columns (same format as Maze.get_maze)."""
+        return [[self.is_path(x, y) for y in range(self.height)] for x in range(self.width)]
+
+    def is_path(self, x, y):
+        """Returns if space defined by x and y is a path."""
+        i = x * self.height + y
+        return (self.maze[i >> 3] >> (7 - (i & 7))) & 1
+
+    def make_path(self, x, y):
+        """Makes the space defined by x and y a path."""
+        i = x * self.height + y
+        self.maze[i >> 3] |= 0x80 >> (i & 7)
+
+    def make_wall(self, x, y):
+        """Makes the space defined by x and y a wall."""
+        i = x * self.height + y
+        self.maze[i >> 3] &= ~(0x80 >> (i & 7)) & 0xff
+
+    def as_array(self):
+        """Returns the grid as a (width, height) numpy array of 0s and 1s."""
+        bits = np.unpackbits(np.frombuffer(self.maze, dtype=np.uint8))
+        return bits[:self.width * self.height].reshape(self.width, self.height)
+
+    def load_array(self, grid):
+        """Replaces the grid with the values of a (width, height) numpy array."""
+        self.maze = bytearray(np.packbits((grid != 0).ravel()).tobytes())
+
+
+class ArrayMaze(Maze):
+    """Maze stored in a (width, height) numpy array, indexed [x, y].
+
+    Methods:
+        make_base_grid - Sets up self.maze as a numpy array.
+        size_in_bytes - Returns the approximate number of bytes used to store the grid.
+        get_maze - Returns maze as a list of columns (same format as Maze.get_maze).
+        is_path - Returns if space defined by x and y is a path.
+        make_path - Makes the space defined by x and y a path.
+        make_wall - Makes the space defined by x and y a wall.
+        as_array - Returns the grid array itself (not a copy).
+        load_array - Replaces the grid with the values of a (width, height) numpy array.
+    """
+    def make_base_grid(self, walls):
+        """Sets up self.maze as a numpy array.
+
+        Args:
+            walls - make all spaces in the grid walls, False = make all spaces paths
+        """
+        if walls:
+            self.maze = np.zeros((self.width, self.height), dtype=np.uint8)
+        else:
+            self.maze = np.ones((self.width, self.height), dtype=np.uint8)
+
+    def size_in_bytes(self):
+        """Returns the approximate number of bytes used to store the grid."""
+        return self.maze.nbytes
+
+    def get_maze(self):
+        """Returns maze as a list of columns (same format as Maze.get_maze)."""
+        return self.maze.tolist()
+
+    def is_path(self, x, y):
+        """Returns if space defined by x and y is a path."""
+        return self.maze.item(x, y)
+
+    def make_path(self, x, y):
+        """Makes the space defined by x and y a path."""
+        self.maze[x, y] = 1
+
+    def make_wall(self, x, y):
+        """Makes the space defined by x and y a wall."""
+        self.maze[x, y] = 0
+
+    def as_array(self):
+        """Returns the grid array itself (not a copy)."""
+        return self.maze
+
+    def load_array(self, grid):
+        """Replaces the grid with the values of a (width, height) numpy array."""
+        self.maze = (grid != 0).astype(np.uint8)
+
+
+# maze classes available for storing layouts, keyed by the 'storage' setting
+MAZE_STORAGE = {'LIST': Maze, 'BYTES': ByteMaze, 'BITS': BitMaze}
+if np is not None:
+    MAZE_STORAGE['ARRAY'] = ArrayMaze
+
+# (identifier, name, description) of every storage, for the layout storage setting
+STORAGE_ITEMS = [(key, name, description) for key, name, description in (
+    ('LIST', "Lists", "Python lists (fastest access, most memory)"),
+    ('BYTES', "Bytes", "Flat byte array (1 byte per space)"),
+    ('BITS', "Bits", "Bit-packed array (1 bit per space, least memory)"),
+    ('ARRAY', "NumPy", "NumPy array (1 byte per space, fast whole-grid queries)")) if key in MAZE_STORAGE]
+
+
+def storage_class(storage):
+    """Returns the MAZE_STORAGE class for storage, the 'BYTES' class if it isn't available (e.g. 'ARRAY' without
+    numpy)."""
+    try:
+        return MAZE_STORAGE[storage]
+    except KeyError:
+        logger.warning("Layout storage {!r} isn't available, using 'BYTES' instead".format(storage))
+        return MAZE_STORAGE['BYTES']
+
+
+def convert_maze(maze, storage):
+    """Returns a copy of maze stored as the MAZE_STORAGE class for storage (or maze itself if it already is)."""
+    maze_class = storage_class(storage)
+    if type(maze) is maze_class:
+        return maze
+
+    new_maze = maze_class(maze.width, maze.height)
+    if np is not None:
+        new_maze.load_array(maze.as_array())
+    else:
+        for x in range(maze.width):
+            for y in range(maze.height):
+                if maze.is_path(x, y):
+                    new_maze.make_path(x, y)
+    return new_maze
+
 
 class OrthogonalMaze:
     """Flexible and powerful grid-based maze generation class.
@@ -217,13 +492,24 @@ class OrthogonalMaze:
         ordered_pair - Returns the ordered pair of passed index.
         limited_paths_check - Returns True if space is neighboring more than max_allowed spaces, False otherwise.
         choose_ind -  Chooses index...only a stub.
+        make_frontier - Returns the empty container that self.cells uses (a list by default).
+        remove_cell - Removes the cell at index from self.cells.
         paths_only - Filters out all wall spaces from a list of spaces.
         get - Returns maze.
         display - Prints maze to terminal or console window.
     """
 
-    def __init__(self, debug, width=10, height=10):
-        """Initializes variables, creates maze grid, starts progress report, makes maze, ends progress report."""
+    def __init__(self, debug, width=10, height=10, storage='LIST', seed=None, rng=None):
+        """Initializes variables, creates maze grid, starts progress report, makes maze, ends progress report.
+
+        Args:
+            debug - (boolean) debug mode
+            width - (int) width of the maze
+            height - (int) height of the maze
+            storage - (string) key in MAZE_STORAGE for how the grid is stored: 'LIST', 'BYTES', 'BITS' or 'ARRAY'
+            seed - seed for a new random.Random, the same seed and settings always make the same maze
+            rng - (random.Random) random number generator to use instead of seeding a new one
+        """
         global IN_BLENDER
         self.IN_BLENDER = IN_BLENDER
 
@@ -233,9 +519,10 @@ class OrthogonalMaze:
         self.debug = debug
         self.width = width
         self.height = height
+        self.rng = rng if rng is not None else random.Random(seed)
 
-        self.maze = Maze(width, height)
-        self.cells = []
+        self.maze = storage_class(storage)(width, height)
+        self.cells = self.make_frontier()
         self.loops = 0
         self.estimated_loops = int((self.width * self.height * 1.25))
 
@@ -247,7 +534,7 @@ class OrthogonalMaze:
 
         if self.IN_BLENDER:
             self.bldr_prog.finish()
-        else:
+        elif self.debug:
             self.display()
 
     def make(self):
@@ -281,16 +568,17 @@ class OrthogonalMaze:
 
             # remove from cells list if index has not been found
             if index is not None:
-                self.cells.pop(index)
+                self.remove_cell(index)
 
             self.loop_update()
 
     def start_location(self):
         """Generates random, even x and y values."""
-        return random.randint(0, int((self.width - 1) / 2)) * 2, random.randint(0, int((self.height - 1) / 2)) * 2
+        return self.rng.randint(0, int((self.width - 1) / 2)) * 2, self.rng.randint(0, int((self.height - 1) / 2)) * 2
 
     def shuffle_directions(self, directions):
-        return random.shuffle(directions)
+        self.rng.shuffle(directions)
+        return directions
 
     @staticmethod
     def get_directions(x, y):
@@ -312,7 +600,7 @@ class OrthogonalMaze:
             self.loops += 1
             progress = self.loops / self.estimated_loops
             self.bldr_prog.update(progress)
-        else:
+        elif self.debug:
             self.display()
             if sleep_time:
                 sleep(sleep_time)
@@ -329,6 +617,14 @@ class OrthogonalMaze:
         """Chooses index...only a stub."""
         return 0
 
+    def make_frontier(self):
+        """Returns the empty container that self.cells uses (a list by default)."""
+        return []
+
+    def remove_cell(self, index):
+        """Removes the cell at index from self.cells."""
+        self.cells.pop(index)
+
     def paths_only(self, spaces):
         """Filters out all wall spaces from a list of spaces."""
 
@@ -388,7 +684,7 @@ class GraphTheoryMaze(PassageCarverMaze):
     def shuffle_directions(self, directions):
         choices = ['X', 'Y']
         if self.bias_direction not in choices:
-            self.bias_direction = random.choice(choices)
+            self.bias_direction = self.rng.choice(choices)
 
         if self.bias_direction == 'X':
             w_dirs = list(zip(directions, [0, 0, 1, 1]))
@@ -396,13 +692,20 @@ class GraphTheoryMaze(PassageCarverMaze):
             w_dirs = list(zip(directions, [1, 1, 0, 0]))
         else:
             w_dirs = list(zip(directions, [1, 1, 1, 1]))
-        return weira.weira_shuffle(w_dirs, self.bias)
+        return weira.weira_shuffle(w_dirs, self.bias, self.rng)
 
 
 class BreadthFirstMaze(GraphTheoryMaze):
     def choose_ind(self):
         return 0
 
+    def make_frontier(self):
+        # always takes from the front, so a deque keeps removal O(1)
+        return deque()
+
+    def remove_cell(self, index):
+        self.cells.popleft()
+
 
 class DepthFirstMaze(GraphTheoryMaze):
     def choose_ind(self):
@@ -411,11 +714,17 @@ class DepthFirstMaze(GraphTheoryMaze):
 
 class PrimsMaze(GraphTheoryMaze):
     def choose_ind(self):
-        return random.randint(0, len(self.cells) - 1)
+        return self.rng.randint(0, len(self.cells) - 1)
+
+    def remove_cell(self, index):
+        # order doesn't matter for a random pick, so swap the last cell into the hole...O(1)
+        last = self.cells.pop()
+        if index < len(self.cells):
+            self.cells[index] = last
 
 
 class BinaryTreeMaze(PassageCarverMaze):
-    def __init__(self, directions='RANDOM', tileable=False, **kwargs):
+    def __init__(self, directions='RANDOM', tileable=False, vectorized=False, **kwargs):
 
         # parse 'directions' to make tuple
         if directions == 'NE':
@@ -427,14 +736,23 @@ class BinaryTreeMaze(PassageCarverMaze):
         elif directions == 'SW':
             self.directions = ['S', 'W']
         else:
-            possible_dirs = [['N', 'E'], ['N', 'W'], ['S', 'E'], ['S', 'W']]
-            self.directions = random.choice(possible_dirs)
+            # picked in make() once we have self.rng
+            self.directions = None
 
         self.tileable = tileable
+        self.vectorized = vectorized and np is not None
 
         super().__init__(**kwargs)
 
     def make(self):
+        if self.directions is None:
+            possible_dirs = [['N', 'E'], ['N', 'W'], ['S', 'E'], ['S', 'W']]
+            self.directions = self.rng.choice(possible_dirs)
+
+        if self.vectorized:
+            self.make_vectorized()
+            return
+
         # start in top, left corner
         for x in range(self.width)[::2]:
             for y in range(self.height)[::2]:
@@ -443,7 +761,7 @@ class BinaryTreeMaze(PassageCarverMaze):
                 # this controls how we handle the edges
                 if self.tileable:
                     self.maze.make_path(x, y)
-                    d = random.choice(self.directions)
+                    d = self.rng.choice(self.directions)
                 else:
                     temp_directions = []
 
@@ -463,7 +781,7 @@ class BinaryTreeMaze(PassageCarverMaze):
 
                     # choose direction
                     if temp_directions:
-                        d = random.choice(temp_directions)
+                        d = self.rng.choice(temp_directions)
                 if d:
                     nx, ny = self.dir_to_ordered_pair(x, y, d, 1)
                     if self.maze.exist_test(nx, ny):
@@ -471,15 +789,52 @@ class BinaryTreeMaze(PassageCarverMaze):
 
                 self.loop_update()
 
+    def make_vectorized(self):
+        """Same as make, but every space's choice is drawn at once and carved with numpy array writes."""
+        # offsets of the two directions we can carve in (see dir_to_ordered_pair)
+        dy = -1 if 'N' in self.directions else 1
+        dx = -1 if 'W' in self.directions else 1
+
+        xs = np.arange(0, self.width, 2)[:, np.newaxis]
+        ys = np.arange(0, self.height, 2)[np.newaxis, :]
+        shape = (xs.shape[0], ys.shape[1])
+
+        grid = np.zeros((self.width, self.height), dtype=np.uint8)
+        grid[::2, ::2] = 1
+
+        # one coin flip per space: True = vertical, False = horizontal
+        rand_state = np.random.RandomState(self.rng.getrandbits(32))
+        coin = rand_state.random_sample(shape) < 0.5
+
+        # this controls how we handle the edges
+        if self.tileable:
+            vertical = coin
+            horizontal = ~coin
+        else:
+            can_go_vertical = np.broadcast_to(ys > 0 if dy < 0 else ys < self.height - 1, shape)
+            can_go_horizontal = np.broadcast_to(xs > 0 if dx < 0 else xs < self.width - 1, shape)
+            vertical = can_go_vertical & (coin | ~can_go_horizontal)
+            horizontal = can_go_horizontal & ~vertical
+
+        # carve the chosen neighbors that are inside the maze
+        x, y = np.nonzero(vertical)
+        x, y = x * 2, y * 2 + dy
+        inside = (y >= 0) & (y < self.height)
+        grid[x[inside], y[inside]] = 1
+
+        x, y = np.nonzero(horizontal)
+        x, y = x * 2 + dx, y * 2
+        inside = (x >= 0) & (x < self.width)
+        grid[x[inside], y[inside]] = 1
+
+        self.maze.load_array(grid)
+
 
 class SetBasedMaze(OrthogonalMaze):
     def __init__(self, **kwargs):
-        self.tree = Tree()
+        self.sets = DisjointSet()
         super().__init__(**kwargs)
 
-    def knock_out_wall(self, x1, x2):
-        self.maze.make_path(round(avg(x1, x2)), self.y)
-
 
 class KruskalsMaze(PassageCarverMaze, SetBasedMaze):
     def __init__(self, **kwargs):
@@ -507,37 +862,40 @@ class KruskalsMaze(PassageCarverMaze, SetBasedMaze):
 
         """
 
-        # create the tree and carve out the 0's
-        self.tree = Tree()
+        # one set per 0 (numbered column by column), then carve out the 0's
+        rows = (self.height + 1) // 2
+        self.sets = DisjointSet(((self.width + 1) // 2) * rows)
         for x in range(self.width)[::2]:
             for y in range(self.height)[::2]:
-                self.tree.new_node((x, y))
                 self.maze.make_path(x, y)
 
-        # create a list of all the walls
+        def node(x, y):
+            return (x >> 1) * rows + (y >> 1)
+
+        # create a list of all the walls that have a 0 on both sides
         walls = []
         for y in range(self.height):
             for x in range(self.width)[::2]:
                 if y & 1:
-                    walls.append((x, y))
+                    if y + 1 < self.height:
+                        walls.append((x, y))
                 else:
-                    if x + 1 < self.width:
+                    if x + 2 < self.width:
                         walls.append((x + 1, y))
 
-        random.shuffle(walls)
+        self.rng.shuffle(walls)
 
         while walls:
-            w = walls.pop()
+            x, y = walls.pop()
             # if the wall's y-value is odd, the paths will be up and down
-            if w[1] & 1:
-                if self.tree.get_root((w[0], w[1] + 1)) != self.tree.get_root((w[0], w[1] - 1)):
-                    self.maze.make_path(w[0], w[1])
-                    # parent the roots of the two path spaces to each other
-                    self.tree.parent(self.tree.get_root((w[0], w[1] + 1)), self.tree.get_root((w[0], w[1] - 1)))
+            if y & 1:
+                joined = self.sets.union(node(x, y + 1), node(x, y - 1))
             else:
-                if self.tree.get_root((w[0] + 1, w[1])) != self.tree.get_root((w[0] - 1, w[1])):
-                    self.maze.make_path(w[0], w[1])
-                    self.tree.parent(self.tree.get_root((w[0] + 1, w[1])), self.tree.get_root((w[0] - 1, w[1])))
+                joined = self.sets.union(node(x + 1, y), node(x - 1, y))
+
+            # only knock the wall out if it joined two different sets
+            if joined:
+                self.maze.make_path(x, y)
 
             self.loop_update()
 
@@ -549,82 +907,98 @@ class EllersMaze(PassageCarverMaze, SetBasedMaze):
         super().__init__(**kwargs)
 
     def make(self):
-        # create all nodes we will ever need to use (we only build one row at a time)
-        for a in range(self.width)[::2]:
-            self.tree.new_node(name=a)
-
-        # make all of these paths
-        for x in self.tree.get_nodes():
-            self.maze.make_path(x, 0)
-
-        # loop over every other y-value so if height = 5 we loop: 0, 2, 4 as y
-        for y in range(self.height)[::2]:
-            self.y = y  # update here so we don't have to keep passing it as an arg
-
-            # combine sets - use bias
-            for node in self.tree.get_nodes():
-                neighbor = node + 2
-
-                # this must be tried b/c neighbor +2 (so out of range of keys)...dict is
-                # unordered so we can't use slicing to skip the last one :(
-                try:
-                    # if they are already the same set type we would introduce a loop
-                    if self.tree.get_root(node) == self.tree.get_root(neighbor):
-                        continue
-                except KeyError:
-                    continue
+        # progress is reported once per row
+        self.estimated_loops = self.height
 
-                if random.random() > 1 - (1 - self.bias) and y < self.height - 1:
-                    self.combine_sets(node, neighbor)
+        for y, row in enumerate(ellers_rows(self.width, self.height, self.bias, self.rng)):
+            self.y = y
+            for x in find_all(row, 1):
+                self.maze.make_path(x, y)
 
-                self.loop_update()
+            self.loop_update()
 
-            # drop down sets - use drop_down_chance?
-            if y < self.height - 1:
-                self.drop_down()
-
-        # knock out walls in the bottom row to remove isolated regions
-        self.finish_bottom()
-
-    def combine_sets(self, x1, x2):
-        # self.tree.unparent(x2)
-        root = self.tree.get_root(x2)
-        self.tree.parent(root, x1)
-
-        # knock out wall between on maze
-        self.knock_out_wall(x1, x2)
-
-    def drop_down(self):
-        def drop(x):
-            if self.maze.exist_test(x, self.y + 1):
-                self.maze.make_path(x, self.y + 1)
-                self.maze.make_path(x, self.y + 2)
-            return x
-
-        dropped = []
-        for root in self.tree.get_roots():
-            nodes_on_rt = [a for a in self.tree.get_nodes() if self.tree.child_of(a, root)] + [root]
-            # drop AT LEAST one from each 'root'...
-            for _ in nodes_on_rt:
-                dropped.append(drop(random.choice(nodes_on_rt)))
-
-        # make the rest become roots
-        for leaf in self.tree.get_nodes():
-            if leaf not in dropped:
-                self.tree.replacement_child_shift_detach(leaf)
-                self.maze.make_path(leaf, self.y + 2)
-
-    def finish_bottom(self):
-        for node in self.tree.get_nodes():
-            neighbor = node + 2
-            # this must be tried b/c neighbor +2 (so out of range of keys)...dict is
-            # unordered so we can't use slicing to skip the last one :(
-            try:
-                if self.tree.get_root(node) != self.tree.get_root(neighbor):
-                    self.combine_sets(node, neighbor)
-            except KeyError:
+
+def ellers_rows(width, height, bias=0.0, rng=random):
+    """Yields the rows of an Eller's maze one at a time, from y = 0 down.
+
+    Only the current row and its sets are kept, so memory stays O(width) however tall the maze is.
+
+    Args:
+        width - (int) width of the maze
+        height - (int) height of the maze
+        bias - (float) 0 to 1, higher values join fewer neighbors in a row (more vertical passages)
+        rng - (random.Random) random number generator to use, the random module by default
+
+    Yields:
+        (bytearray) one row of the maze indexed by x, 1 = path, 0 = wall
+    """
+    # one set per path column in the row (node i is at x = i * 2)
+    num_nodes = len(range(width)[::2])
+    sets = DisjointSet(num_nodes)
+
+    # loop over every other y-value so if height = 5 we loop: 0, 2, 4 as y
+    for y in range(height)[::2]:
+        last_row = y + 2 >= height
+
+        row = bytearray(width)
+        row[::2] = b'\x01' * num_nodes
+
+        # combine sets - use bias...on the last row combine everything so there are no isolated regions
+        for node in range(num_nodes - 1):
+            # if they are already the same set we would introduce a loop
+            if sets.same_set(node, node + 1):
                 continue
 
+            if last_row or rng.random() > bias:
+                sets.union(node, node + 1)
+                row[node * 2 + 1] = 1
+
+        yield row
+
+        if last_row:
+            # even heights leave one row of wall below the last path row
+            if y + 1 < height:
+                yield bytearray(width)
+            break
+
+        # drop down sets...dropped nodes stay in the same set in the next row, the rest become sets of their own
+        below = bytearray(width)
+        next_sets = DisjointSet(num_nodes)
+        for nodes_in_set in sets.groups().values():
+            # drop AT LEAST one from each set...
+            dropped = set(rng.choice(nodes_in_set) for _ in nodes_in_set)
+            first = min(dropped)
+            for node in dropped:
+                next_sets.union(first, node)
+                below[node * 2] = 1
+
+        sets = next_sets
+        yield below
+
+
+# for writing rows of 0s and 1s as text
+ROW_TO_TEXT = bytes.maketrans(b'\x00\x01', b'01')
+
+
+def write_rows(rows, stream):
+    """Writes rows (e.g. from ellers_rows) to a text stream as they are made.
+
+    The text is in the same format as txt_img_converter.str_list_maze: '1' for paths, '0' for walls, row after row
+    without separators.
+
+    Args:
+        rows - iterable of bytearray rows, 1 = path, 0 = wall
+        stream - file-like object opened for writing text
+
+    Returns:
+        (int) number of rows written
+    """
+    num_rows = 0
+    for row in rows:
+        stream.write(row.translate(ROW_TO_TEXT).decode())
+        num_rows += 1
+    return num_rows
+
 
 def main():
     # BinaryTreeMaze('NW', debug=True, width=33, height=23)
@@ -633,6 +1007,7 @@ def main():
     # BreadthFirstMaze(bias_direction='RANDOM', bias=.5, debug=True, width=99, height=45)
     EllersMaze(bias=0.75, debug=True, width=99, height=45)
     # KruskalsMaze(debug=True, width=99, height=45)
+    # write_rows(ellers_rows(99, 45, bias=0.75), sys.stdout)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,672 @@
+# Copyright 2017 Integrity Software and Games, LLC
+#
+# ##### BEGIN GPL LICENSE BLOCK ######
+# This file is part of UltiMaze.
+#
+# UltiMaze is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# UltiMaze is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Builds mesh data (flat vertex and quad buffers) for 3D mazes without touching bpy.
+
+Available Functions:
+    maze_quads - Returns a QuadMesh of the floors, wall tops, and wall sides of a maze
+    quad_loops - Returns the polygon loop_start and loop_total buffers of a mesh of quads
+    chunk_ranges - Yields the regions of a grid split into square chunks
+    merged_maze_quads - Returns a QuadMesh like maze_quads, but with coplanar neighboring quads merged
+    maze_lods - Returns level of detail meshes of a maze, all built from a single read of the layout
+    dupli_vert_coords - Returns the origin and vertex coordinates of a dupliverts emitter placing tiles at spaces
+    place_tile_coords - Returns tile vertex coordinates rotated and moved onto every space (needs numpy)
+    repeat_indices - Returns indices repeated once per copy, each copy offset by a step (needs numpy)
+    grid_quads - Returns flat numpy vertex and quad arrays of a maze, built with array operations on its path mask
+    add_flat_quads - Adds an upward facing quad at height z for every rectangle of spaces
+    add_side_quads - Adds a wall side quad facing its path for every run from MazeRegion.side_runs
+    path_mask - Returns a flat bytearray of 1s (paths) and 0s (walls) indexed x * height + y
+    greedy_rectangles - Yields maximal rectangles that together cover every set space in a grid mask
+    runs - Yields the (start, end) of every run of set items in a sequence
+"""
+
+IN_BLENDER = True
+
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if IN_BLENDER:
+    from .logging_setup import setup_logger
+else:
+    from logging_setup import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class QuadMesh:
+    """Quads on the corner lattice of a maze grid, where every corner vertex is only made once.
+
+    Corner (i, j, k) is the corner between spaces (i - 1, j - 1) and (i, j) at height k (0 = floor, 1 = wall top), so
+    space (x, y) is bounded by corners x to x + 1 and y to y + 1. Vertices are made the first time a quad uses their
+    corner, which keeps the mesh free of doubles (no remove_doubles pass needed).
+
+    The grid can be a part of a bigger maze starting at space 'origin': corners still use (and vertices are still
+    placed at) the maze's coordinates, so meshes of neighboring parts line up.
+
+    When quads are added one column of spaces at a time (see maze_quads), a rolling mesh only keeps the corner
+    lookup of the two lattice columns in use, so the lookup's memory grows with the height instead of the area.
+
+    Methods:
+        __init__ - Sets up the empty vertex and quad buffers and the corner lookup for a width x height grid at origin.
+        start_column - Starts adding the quads of space column x to a rolling mesh.
+        corner - Returns the vertex index of corner (i, j, k), making the vertex if needed.
+        add_quad - Adds a quad between 4 corners.
+        num_verts - Returns the number of vertices.
+        num_quads - Returns the number of quads.
+    """
+    def __init__(self, width, height, origin=(0, 0), rolling=False):
+        """Sets up the empty vertex and quad buffers and the corner lookup for a width x height grid at origin.
+
+        Args:
+            width - (int) width of the grid in spaces
+            height - (int) height of the grid in spaces
+            origin - (tuple) (x, y) space of the maze the grid starts at
+            rolling - (bool) only keep the corners of two lattice columns, quads must then be added column by
+                      column after calling start_column
+        """
+        self.width = width
+        self.height = height
+        self.origin = origin
+
+        # flat buffers ready for foreach_set: x, y, z... and 4 vertex indices per quad
+        self.coords = array('f')
+        self.quads = array('i')
+
+        # vertex index of every lattice corner (or of the two live columns' corners), -1 until it is used
+        self.columns = 2 if rolling else width + 1
+        self.corner_verts = array('i', [-1]) * (2 * self.columns * (height + 1))
+
+    def start_column(self, x):
+        """Starts adding the quads of space column x to a rolling mesh.
+
+        Space column x uses lattice columns x and x + 1, so the slot of lattice column x - 1 is cleared for x + 1.
+        """
+        if x == self.origin[0] or self.columns != 2:
+            return
+        rows = self.height + 1
+        slot = (x + 1 - self.origin[0]) % 2
+        for k in range(2):
+            start = (k * 2 + slot) * rows
+            self.corner_verts[start:start + rows] = array('i', [-1]) * rows
+
+    def corner(self, i, j, k):
+        """Returns the vertex index of corner (i, j, k), making the vertex if needed."""
+        key = (k * self.columns + (i - self.origin[0]) % self.columns) * (self.height + 1) + j - self.origin[1]
+        vert = self.corner_verts[key]
+        if vert < 0:
+            vert = len(self.coords) // 3
+            self.coords.extend((i - 0.5, -(j - 0.5), k))
+            self.corner_verts[key] = vert
+        return vert
+
+    def add_quad(self, c1, c2, c3, c4):
+        """Adds a quad between 4 corners, each an (i, j, k) tuple."""
+        corner = self.corner
+        self.quads.extend((corner(*c1), corner(*c2), corner(*c3), corner(*c4)))
+
+    def num_verts(self):
+        """Returns the number of vertices."""
+        return len(self.coords) // 3
+
+    def num_quads(self):
+        """Returns the number of quads."""
+        return len(self.quads) // 4
+
+
+def quad_loops(num_quads):
+    """Returns the polygon loop_start and loop_total buffers of a mesh of quads.
+
+    Args:
+        num_quads - (int) number of quads
+
+    Returns:
+        (tuple of arrays of ints) loop_start (0, 4, 8...) and loop_total (4, 4, 4...), ready for foreach_set
+    """
+    return array('i', range(0, num_quads * 4, 4)), array('i', [4]) * num_quads
+
+
+def chunk_ranges(width, height, size):
+    """Yields the (x0, y0, x1, y1) regions of a width x height grid split into size x size chunks.
+
+    Chunks on the right and bottom edges are smaller when size doesn't divide the grid evenly. x1 and y1 are exclusive.
+    """
+    for x0 in range(0, width, size):
+        for y0 in range(0, height, size):
+            yield x0, y0, min(x0 + size, width), min(y0 + size, height)
+
+
+def path_mask(maze, region=None):
+    """Returns a flat bytearray of 1s (paths) and 0s (walls) indexed (x - x0) * (y1 - y0) + y - y0.
+
+    Args:
+        maze - maze to read
+        region - (tuple) optional (x0, y0, x1, y1) part of the maze to read, the whole maze by default
+    """
+    if region is None:
+        if np is not None:
+            return bytearray((maze.as_array() != 0).astype(np.uint8).tobytes())
+        region = (0, 0, maze.width, maze.height)
+
+    x0, y0, x1, y1 = region
+    is_path = maze.is_path
+    mask = bytearray((x1 - x0) * (y1 - y0))
+    i = 0
+    for x in range(x0, x1):
+        for y in range(y0, y1):
+            if is_path(x, y):
+                mask[i] = 1
+            i += 1
+    return mask
+
+
+def greedy_rectangles(mask, width, height):
+    """Yields maximal rectangles that together cover every set space in a grid mask.
+
+    Each rectangle is grown as far as it can go along y, then along x, from the first space not covered yet.
+
+    Args:
+        mask - (bytearray) 1 for spaces to cover, indexed x * height + y
+        width - (int) width of the grid
+        height - (int) height of the grid
+
+    Returns:
+        (generator of tuples) (x0, y0, x1, y1) where the rectangle covers spaces x0 to x1 - 1 and y0 to y1 - 1
+    """
+    todo = bytearray(mask)
+    for x0 in range(width):
+        column = x0 * height
+        y0 = 0
+        while y0 < height:
+            if not todo[column + y0]:
+                y0 += 1
+                continue
+
+            # grow along y
+            y1 = y0 + 1
+            while y1 < height and todo[column + y1]:
+                y1 += 1
+
+            # grow along x while the whole span is still uncovered
+            span = y1 - y0
+            full = b'\x01' * span
+            x1 = x0 + 1
+            while x1 < width and todo[x1 * height + y0:x1 * height + y1] == full:
+                x1 += 1
+
+            for x in range(x0, x1):
+                todo[x * height + y0:x * height + y1] = bytes(span)
+
+            yield x0, y0, x1, y1
+            y0 = y1
+
+
+def runs(flags):
+    """Yields the (start, end) of every run of set items in a sequence (end is exclusive)."""
+    start = None
+    for i, flag in enumerate(flags):
+        if flag and start is None:
+            start = i
+        elif not flag and start is not None:
+            yield start, i
+            start = None
+    if start is not None:
+        yield start, len(flags)
+
+
+class MazeRegion:
+    """The path and wall masks of a region of a maze, read once and shared by every mesh built from the region.
+
+    The masks include one space of margin around the region so walls on its edge can see the paths next to them.
+
+    Methods:
+        __init__ - Reads the masks for the (x0, y0, x1, y1) region of maze (the whole maze by default).
+        new_mesh - Returns an empty QuadMesh for the region.
+        column - Returns the region's part of column x of a mask.
+        row - Returns the region's part of row y of a mask.
+        cells - Returns a (x0, y0, x1, y1) rectangle for every set space of a mask in the region.
+        rectangles - Returns maximal rectangles covering every set space of a mask in the region.
+        side_runs - Returns the runs of wall sides in the region as (facing, line, start, end) tuples.
+    """
+    def __init__(self, maze, region=None):
+        """Reads the masks for the (x0, y0, x1, y1) region of maze (the whole maze by default)."""
+        self.width = maze.width
+        self.height = maze.height
+        self.region = region if region is not None else (0, 0, maze.width, maze.height)
+        x0, y0, x1, y1 = self.region
+
+        self.margin = (max(x0 - 1, 0), max(y0 - 1, 0), min(x1 + 1, maze.width), min(y1 + 1, maze.height))
+        self.margin_height = self.margin[3] - self.margin[1]
+        if self.margin == (0, 0, maze.width, maze.height):
+            self.paths = path_mask(maze)
+        else:
+            self.paths = path_mask(maze, self.margin)
+        self.walls = self.paths.translate(bytes.maketrans(b'\x00\x01', b'\x01\x00'))
+
+    def new_mesh(self):
+        """Returns an empty QuadMesh for the region."""
+        x0, y0, x1, y1 = self.region
+        return QuadMesh(x1 - x0, y1 - y0, (x0, y0))
+
+    def column(self, mask, x):
+        """Returns the region's part of column x of a mask."""
+        start = (x - self.margin[0]) * self.margin_height + self.region[1] - self.margin[1]
+        return mask[start:start + self.region[3] - self.region[1]]
+
+    def row(self, mask, y):
+        """Returns the region's part of row y of a mask."""
+        mx0, my0 = self.margin[:2]
+        return mask[(self.region[0] - mx0) * self.margin_height + y - my0:
+                    (self.region[2] - mx0) * self.margin_height:self.margin_height]
+
+    def cells(self, mask):
+        """Returns a (x0, y0, x1, y1) rectangle for every set space of a mask in the region."""
+        x0, y0, x1, y1 = self.region
+        return [(x, y0 + y, x + 1, y0 + y + 1)
+                for x in range(x0, x1) for y, flag in enumerate(self.column(mask, x)) if flag]
+
+    def rectangles(self, mask):
+        """Returns maximal rectangles covering every set space of a mask in the region (see greedy_rectangles)."""
+        x0, y0, x1, y1 = self.region
+        inner = b''.join(self.column(mask, x) for x in range(x0, x1))
+        return [(rx0 + x0, ry0 + y0, rx1 + x0, ry1 + y0)
+                for rx0, ry0, rx1, ry1 in greedy_rectangles(inner, x1 - x0, y1 - y0)]
+
+    def side_runs(self):
+        """Returns the runs of wall sides in the region as (facing, line, start, end) tuples.
+
+        'facing' is the direction of the path the side borders (as in maze_tools.DIR_BITS), 'line' the x (for W and
+        E) or y (for S and N) of the wall spaces, and start to end - 1 the spaces along the line.
+        """
+        x0, y0, x1, y1 = self.region
+        paths = self.paths
+        walls = self.walls
+        sides = []
+
+        # sides facing W and E are runs along y in each column
+        for x in range(x0, x1):
+            wall_column = self.column(walls, x)
+            if x > 0:
+                for start, end in runs([a & b for a, b in zip(wall_column, self.column(paths, x - 1))]):
+                    sides.append(('W', x, y0 + start, y0 + end))
+            if x < self.width - 1:
+                for start, end in runs([a & b for a, b in zip(wall_column, self.column(paths, x + 1))]):
+                    sides.append(('E', x, y0 + start, y0 + end))
+
+        # sides facing S and N are runs along x in each row
+        for y in range(y0, y1):
+            wall_row = self.row(walls, y)
+            if y > 0:
+                for start, end in runs([a & b for a, b in zip(wall_row, self.row(paths, y - 1))]):
+                    sides.append(('S', y, x0 + start, x0 + end))
+            if y < self.height - 1:
+                for start, end in runs([a & b for a, b in zip(wall_row, self.row(paths, y + 1))]):
+                    sides.append(('N', y, x0 + start, x0 + end))
+
+        return sides
+
+
+def add_flat_quads(mesh, rectangles, z):
+    """Adds an upward facing quad at height z for every (x0, y0, x1, y1) rectangle of spaces."""
+    add_quad = mesh.add_quad
+    for x0, y0, x1, y1 in rectangles:
+        add_quad((x0, y1, z), (x1, y1, z), (x1, y0, z), (x0, y0, z))
+
+
+def add_side_quads(mesh, side_runs, merge=True):
+    """Adds a wall side quad facing its path for every run from MazeRegion.side_runs (one per space if not merge)."""
+    add_quad = mesh.add_quad
+    for facing, line, start, end in side_runs:
+        spans = [(start, end)] if merge else [(a, a + 1) for a in range(start, end)]
+        for s, e in spans:
+            if facing == 'W':
+                add_quad((line, s, 0), (line, e, 0), (line, e, 1), (line, s, 1))
+            elif facing == 'E':
+                add_quad((line + 1, s, 1), (line + 1, e, 1), (line + 1, e, 0), (line + 1, s, 0))
+            elif facing == 'S':
+                add_quad((s, line, 1), (e, line, 1), (e, line, 0), (s, line, 0))
+            else:
+                add_quad((s, line + 1, 0), (e, line + 1, 0), (e, line + 1, 1), (s, line + 1, 1))
+
+
+def merged_maze_quads(maze, progress=None, region=None):
+    """Returns a QuadMesh like maze_quads, but with coplanar neighboring quads merged.
+
+    Floors and wall tops are merged into maximal rectangles and wall sides into runs along each wall. This leaves
+    T-junctions where a long quad meets several short ones, which render fine but aren't welded.
+    """
+    maze_region = MazeRegion(maze, region)
+    mesh = maze_region.new_mesh()
+
+    add_flat_quads(mesh, maze_region.rectangles(maze_region.paths), 0)
+    add_flat_quads(mesh, maze_region.rectangles(maze_region.walls), 1)
+
+    if progress is not None:
+        progress(0.5)
+
+    add_side_quads(mesh, maze_region.side_runs())
+
+    logger.debug("Made {} verts and {} merged quads for {}".format(mesh.num_verts(), mesh.num_quads(),
+                                                                   maze_region.region))
+    return mesh
+
+
+def maze_lods(maze, progress=None, region=None):
+    """Returns level of detail meshes of a maze, all built from a single read of the layout.
+
+    Args:
+        maze - maze to build the meshes for
+        progress - (function) optional, called with the progress as a decimal number after each level
+        region - (tuple) optional (x0, y0, x1, y1) part of the maze to build, the whole maze by default
+
+    Returns:
+        (dict of QuadMeshes) 'FULL' - a quad for every floor, top, and side (like maze_quads),
+                             'MERGED' - merged blocks (like merged_maze_quads),
+                             'HEIGHTFIELD' - merged floors and tops only, without any sides
+    """
+    maze_region = MazeRegion(maze, region)
+    side_runs = maze_region.side_runs()
+    lods = {}
+
+    full = lods['FULL'] = maze_region.new_mesh()
+    add_flat_quads(full, maze_region.cells(maze_region.paths), 0)
+    add_flat_quads(full, maze_region.cells(maze_region.walls), 1)
+    add_side_quads(full, side_runs, merge=False)
+    if progress is not None:
+        progress(1 / 3)
+
+    floors = maze_region.rectangles(maze_region.paths)
+    tops = maze_region.rectangles(maze_region.walls)
+
+    merged = lods['MERGED'] = maze_region.new_mesh()
+    add_flat_quads(merged, floors, 0)
+    add_flat_quads(merged, tops, 1)
+    add_side_quads(merged, side_runs)
+    if progress is not None:
+        progress(2 / 3)
+
+    heightfield = lods['HEIGHTFIELD'] = maze_region.new_mesh()
+    add_flat_quads(heightfield, floors, 0)
+    add_flat_quads(heightfield, tops, 1)
+
+    logger.debug("Made LODs with {} quads for {}".format({lod: lods[lod].num_quads() for lod in lods},
+                                                         maze_region.region))
+    return lods
+
+
+def maze_quads(maze, progress=None, merge=False, region=None):
+    """Returns a QuadMesh of the floors, wall tops, and wall sides of a maze.
+
+    Paths get a floor quad at height 0, walls get a top quad at height 1, and every wall space gets a side quad
+    towards each path space touching it. Quads are wound so floors and tops face up and sides face the path they
+    border, so the mesh needs no normals_make_consistent pass.
+
+    Args:
+        maze - maze to build the mesh for
+        progress - (function) optional, called with the progress as a decimal number once per column
+        merge - (bool) merge coplanar neighboring quads (see merged_maze_quads)
+        region - (tuple) optional (x0, y0, x1, y1) part of the maze to build (see chunk_ranges), the whole maze by
+                 default; walls on the region's edge still get sides towards paths outside of it
+
+    Returns:
+        QuadMesh
+    """
+    if merge:
+        return merged_maze_quads(maze, progress, region)
+
+    width = maze.width
+    height = maze.height
+    x0, y0, x1, y1 = region if region is not None else (0, 0, width, height)
+    is_path = maze.is_path
+    # quads are added column by column, so only two lattice columns of corners are kept at once
+    mesh = QuadMesh(x1 - x0, y1 - y0, (x0, y0), rolling=True)
+    add_quad = mesh.add_quad
+
+    for x in range(x0, x1):
+        if progress is not None:
+            progress((x - x0) / (x1 - x0))
+        mesh.start_column(x)
+        for y in range(y0, y1):
+            if is_path(x, y):
+                add_quad((x, y + 1, 0), (x + 1, y + 1, 0), (x + 1, y, 0), (x, y, 0))
+                continue
+
+            add_quad((x, y + 1, 1), (x + 1, y + 1, 1), (x + 1, y, 1), (x, y, 1))
+
+            # sides between this wall and the paths touching it
+            if x > 0 and is_path(x - 1, y):
+                add_quad((x, y, 0), (x, y + 1, 0), (x, y + 1, 1), (x, y, 1))
+            if x < width - 1 and is_path(x + 1, y):
+                add_quad((x + 1, y, 1), (x + 1, y + 1, 1), (x + 1, y + 1, 0), (x + 1, y, 0))
+            if y > 0 and is_path(x, y - 1):
+                add_quad((x, y, 1), (x + 1, y, 1), (x + 1, y, 0), (x, y, 0))
+            if y < height - 1 and is_path(x, y + 1):
+                add_quad((x, y + 1, 0), (x + 1, y + 1, 0), (x + 1, y + 1, 1), (x, y + 1, 1))
+
+    logger.debug("Made {} verts and {} quads for {}".format(mesh.num_verts(), mesh.num_quads(), (x0, y0, x1, y1)))
+    return mesh
+
+
+def grid_quads(maze, region=None, paths=None, closed=False, base=0.2):
+    """Returns flat numpy vertex and quad arrays of a maze, built with array operations on its path mask (needs numpy).
+
+    This makes the same quads as maze_quads, but instead of visiting every space it takes all floors, tops, and
+    sides of each direction from boolean masks of the grid at once. Quads are indexed into the (width + 1) x
+    (height + 1) corner lattice at both heights, then unused corners are dropped so every vertex is used and made
+    once.
+
+    A closed mesh is a solid: the walls on the edge of the region get outer sides, a base 'base' thick is added
+    under the floors, and walls that only touch at a corner get their own top corner vertex, so every edge has
+    exactly two faces. The region is closed on its own, so neighboring closed regions have faces against each other.
+
+    Args:
+        maze - maze to build the mesh for
+        region - (tuple) optional (x0, y0, x1, y1) part of the maze to build, the whole maze by default
+        paths - (numpy bool array) optional width x height path mask of the whole maze (maze.as_array() != 0), so
+                building many regions only converts the maze once
+        closed - (bool) make a closed manifold mesh instead of only the visible floors, tops, and sides
+        base - (float) thickness of the base of a closed mesh
+
+    Returns:
+        (tuple of numpy arrays) (coords, quads) like QuadMesh.coords and QuadMesh.quads
+    """
+    width = maze.width
+    height = maze.height
+    x0, y0, x1, y1 = region if region is not None else (0, 0, width, height)
+    w = x1 - x0
+    h = y1 - y0
+
+    if paths is None:
+        paths = maze.as_array() != 0
+
+    # the region and one space around it...outside of the maze counts as a wall, outside of a closed region as a
+    # path so the walls on its edge get outer sides
+    if closed:
+        padded = np.ones((w + 2, h + 2), dtype=bool)
+        padded[1:-1, 1:-1] = paths[x0:x1, y0:y1]
+    else:
+        padded = np.zeros((w + 2, h + 2), dtype=bool)
+        mx0, my0, mx1, my1 = max(x0 - 1, 0), max(y0 - 1, 0), min(x1 + 1, width), min(y1 + 1, height)
+        padded[mx0 - x0 + 1:mx1 - x0 + 1, my0 - y0 + 1:my1 - y0 + 1] = paths[mx0:mx1, my0:my1]
+
+    paths = padded[1:-1, 1:-1]
+    walls = ~paths
+
+    # lattice heights: floors, tops, the bottom of the base, and the split top corners of a closed mesh
+    heights = (0, 1, -base, 1) if closed else (0, 1)
+
+    def lattice(i, j, k):
+        return (k * (w + 1) + i) * (h + 1) + j
+
+    def spaces(mask):
+        return np.nonzero(mask)
+
+    # two walls only touching at corner (i, j) would share its vertical edge and top vertex, so one of them uses
+    # the top corner at height 3 instead: space (i, j) when it touches space (i - 1, j - 1), space (i, j - 1) when
+    # it touches space (i - 1, j)
+    if closed:
+        a, b, c, d = padded[:-1, :-1], padded[1:, :-1], padded[:-1, 1:], padded[1:, 1:]
+        split_corner = ~a & ~d & b & c
+        split_side = ~b & ~c & a & d
+    else:
+        split_corner = split_side = np.zeros((w + 1, h + 1), dtype=bool)
+
+    def top(x, y, dx, dy):
+        # top corner (x + dx, y + dy) of wall (x, y)
+        k = 1
+        if dx == 0 and dy == 0:
+            k = np.where(split_corner[x, y], 3, 1)
+        elif dx == 0 and dy == 1:
+            k = np.where(split_side[x, y + 1], 3, 1)
+        return lattice(x + dx, y + dy, k)
+
+    faces = []
+
+    # floors and tops
+    x, y = spaces(paths)
+    faces.append(np.stack((lattice(x, y + 1, 0), lattice(x + 1, y + 1, 0),
+                           lattice(x + 1, y, 0), lattice(x, y, 0)), axis=1))
+    x, y = spaces(walls)
+    faces.append(np.stack((top(x, y, 0, 1), top(x, y, 1, 1), top(x, y, 1, 0), top(x, y, 0, 0)), axis=1))
+
+    # sides facing the path on each side of a wall
+    x, y = spaces(walls & padded[:-2, 1:-1])
+    faces.append(np.stack((lattice(x, y, 0), lattice(x, y + 1, 0), top(x, y, 0, 1), top(x, y, 0, 0)), axis=1))
+    x, y = spaces(walls & padded[2:, 1:-1])
+    faces.append(np.stack((top(x, y, 1, 0), top(x, y, 1, 1), lattice(x + 1, y + 1, 0), lattice(x + 1, y, 0)), axis=1))
+    x, y = spaces(walls & padded[1:-1, :-2])
+    faces.append(np.stack((top(x, y, 0, 0), top(x, y, 1, 0), lattice(x + 1, y, 0), lattice(x, y, 0)), axis=1))
+    x, y = spaces(walls & padded[1:-1, 2:])
+    faces.append(np.stack((lattice(x, y + 1, 0), lattice(x + 1, y + 1, 0), top(x, y, 1, 1), top(x, y, 0, 1)), axis=1))
+
+    if closed:
+        # bottom of the base under every space, facing down
+        x, y = spaces(np.ones((w, h), dtype=bool))
+        faces.append(np.stack((lattice(x, y, 2), lattice(x + 1, y, 2),
+                               lattice(x + 1, y + 1, 2), lattice(x, y + 1, 2)), axis=1))
+
+        # sides of the base around the region
+        y = np.arange(h)
+        x = np.zeros(h, dtype=np.int64)
+        faces.append(np.stack((lattice(x, y, 2), lattice(x, y + 1, 2), lattice(x, y + 1, 0), lattice(x, y, 0)), axis=1))
+        x = x + w - 1
+        faces.append(np.stack((lattice(x + 1, y, 0), lattice(x + 1, y + 1, 0),
+                               lattice(x + 1, y + 1, 2), lattice(x + 1, y, 2)), axis=1))
+        x = np.arange(w)
+        y = np.zeros(w, dtype=np.int64)
+        faces.append(np.stack((lattice(x, y, 0), lattice(x + 1, y, 0), lattice(x + 1, y, 2), lattice(x, y, 2)), axis=1))
+        y = y + h - 1
+        faces.append(np.stack((lattice(x, y + 1, 2), lattice(x + 1, y + 1, 2),
+                               lattice(x + 1, y + 1, 0), lattice(x, y + 1, 0)), axis=1))
+
+    quads = np.concatenate(faces).ravel()
+
+    # keep only the used corners, numbered in lattice order
+    used = np.zeros(len(heights) * (w + 1) * (h + 1), dtype=bool)
+    used[quads] = True
+    remap = np.cumsum(used, dtype=np.int64) - 1
+    quads = remap[quads].astype(np.int32)
+
+    keys = np.nonzero(used)[0]
+    k, rest = np.divmod(keys, (w + 1) * (h + 1))
+    i, j = np.divmod(rest, h + 1)
+    z = np.array(heights, dtype=np.float64)[k]
+    coords = np.stack((i + x0 - 0.5, -(j + y0 - 0.5), z), axis=1).astype(np.float32).ravel()
+
+    logger.debug("Made {} verts and {} quads with array operations for {}".format(len(keys), len(quads) // 4,
+                                                                                   (x0, y0, x1, y1)))
+    return coords, quads
+
+
+def dupli_vert_coords(spaces, rotation):
+    """Returns the origin and vertex coordinates of a dupliverts emitter placing tiles at spaces.
+
+    Dupliverts instances take the emitter's rotation, so the emitter is rotated by 'rotation' and its vertices are
+    rotated back by the same angle around the emitter's origin (the first space) to land on the spaces.
+
+    Args:
+        spaces - (list of tuples) (x, y) spaces to place the tile at, with the same y flip as add_tile
+        rotation - (float) z rotation of the tiles in degrees
+
+    Returns:
+        (tuple) (x, y, 0) location of the emitter, (array of floats) flat vertex coordinates relative to it
+    """
+    angle = math.radians(rotation)
+    cos = math.cos(-angle)
+    sin = math.sin(-angle)
+    origin_x, origin_y = spaces[0][0], -spaces[0][1]
+
+    coords = array('f')
+    for x, y in spaces:
+        dx = x - origin_x
+        dy = -y - origin_y
+        coords.extend((dx * cos - dy * sin, dx * sin + dy * cos, 0))
+    return (origin_x, origin_y, 0), coords
+
+
+def place_tile_coords(coords, spaces, rotation):
+    """Returns tile vertex coordinates rotated and moved onto every space (needs numpy).
+
+    This is the transform add_tile gives each tile copy (rotate around z, then move to (x, -y)), done for every copy
+    of a tile at once so the copies can be written straight into one merged mesh.
+
+    Args:
+        coords - (numpy array) (n, 3) vertex coordinates of the tile, already scaled and rotated around x and y
+        spaces - (list of tuples) (x, y) spaces to place the tile at
+        rotation - (float) z rotation of the tiles in degrees
+
+    Returns:
+        (numpy array of float32) (len(spaces) * n, 3) coordinates, one block of n per space in order
+    """
+    angle = math.radians(rotation)
+    cos = math.cos(angle)
+    sin = math.sin(angle)
+    rotate = np.array(((cos, sin, 0), (-sin, cos, 0), (0, 0, 1)), dtype=np.float64)
+    rotated = np.asarray(coords, dtype=np.float64).reshape(-1, 3).dot(rotate)
+
+    offsets = np.zeros((len(spaces), 1, 3), dtype=np.float64)
+    offsets[:, 0, :2] = spaces
+    offsets[:, 0, 1] *= -1
+
+    return (rotated[np.newaxis, :, :] + offsets).reshape(-1, 3).astype(np.float32)
+
+
+def repeat_indices(indices, copies, step, offset=0):
+    """Returns indices repeated once per copy, each copy offset by a step (needs numpy).
+
+    Used to copy the vertex indices (step = vertices per tile) or loop starts (step = loops per tile) of a tile for
+    every copy placed in a merged mesh.
+
+    Args:
+        indices - (numpy array) indices of one copy
+        copies - (int) number of copies
+        step - (int) amount each copy's indices are offset from the last one's
+        offset - (int) offset of the first copy
+
+    Returns:
+        (numpy array of int32) flat indices of all of the copies
+    """
+    indices = np.asarray(indices, dtype=np.int64).ravel()
+    shifts = offset + step * np.arange(copies, dtype=np.int64)
+    return (indices[np.newaxis, :] + shifts[:, np.newaxis]).ravel().astype(np.int32)
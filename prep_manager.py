@@ -20,6 +20,7 @@
 """Exist checks for required resources and complete file saving function.
 
 Available functions:
+    - resolve_tiles: Returns the tile objects of the active tile mode.
     - check_tiles_exist: Check if all tile slots are filled in UI panel.
     - check_list_exist: Check if list is assigned in UI panel.
     - save_text: Saves Blender text block that is stored externally.
@@ -30,11 +31,29 @@ import bpy
 
 from .logging_setup import setup_logger
 from .addon_name import get_addon_name
+from .tile_tools import TILE_NAMES
 
 
 logger = setup_logger(__name__)
 
 
+def resolve_tiles():
+    """Returns the tile objects of the active tile mode, looked up once by the names set in the UI panel.
+
+    Returns:
+        (dict) {tile: object} for every tile slot holding a mesh object, missing or non-mesh tiles are left out
+    """
+    mg = bpy.context.scene.mg
+
+    tiles = {}
+    for tile in TILE_NAMES[mg.tile_mode]:
+        obj = bpy.data.objects.get(getattr(mg, tile))
+        if obj is not None and obj.type == 'MESH':
+            tiles[tile] = obj
+
+    return tiles
+
+
 def check_tiles_exist():
     """Check if all tile slots are filled in UI panel.
 
@@ -46,48 +65,12 @@ def check_tiles_exist():
 
     mg = bpy.context.scene.mg
 
+    tiles = resolve_tiles()
     tiles_exist = True
-    tiles_12 = [(mg.wall_4_sided, "mg.wall_4_sided"),
-               (mg.wall_3_sided, "mg.wall_3_sided"),
-               (mg.wall_2_sided, "mg.wall_2_sided"),
-               (mg.wall_1_sided, "mg.wall_1_sided"),
-               (mg.wall_0_sided, "mg.wall_0_sided"),
-               (mg.wall_corner, "mg.wall_corner"),
-               (mg.floor_4_sided, "mg.floor_4_sided"),
-               (mg.floor_3_sided, "mg.floor_3_sided"),
-               (mg.floor_2_sided, "mg.floor_2_sided"),
-               (mg.floor_1_sided, "mg.floor_1_sided"),
-               (mg.floor_0_sided, "mg.floor_0_sided"),
-               (mg.floor_corner, "mg.floor_corner")]
-
-    tiles_6 = [(mg.four_way, "mg.four_way"),
-               (mg.t_int, "mg.t_int"),
-               (mg.turn, "mg.turn"),
-               (mg.dead_end, "mg.dead_end"),
-               (mg.straight, "mg.straight"),
-               (mg.no_path, "mg.no_path")]
-
-    if mg.tile_mode == 'SIX_TILES':
-        for tile in tiles_6:
-            try:
-                object_type = bpy.data.objects[tile[0]].type
-                if object_type != 'MESH':
-                    tiles_exist = False
-                    exec(tile[1] + "= 'MISSING TILE'")
-            except KeyError:
-                tiles_exist = False
-                exec(tile[1] + "= 'MISSING TILE'")
-
-    elif mg.tile_mode == 'TWELVE_TILES':
-        for tile in tiles_12:
-            try:
-                object_type = bpy.data.objects[tile[0]].type
-                if object_type != 'MESH':
-                    tiles_exist = False
-                    exec(tile[1] + "= 'MISSING TILE'")
-            except KeyError:
-                tiles_exist = False
-                exec(tile[1] + "= 'MISSING TILE'")
+    for tile in TILE_NAMES[mg.tile_mode]:
+        if tile not in tiles:
+            tiles_exist = False
+            setattr(mg, tile, 'MISSING TILE')
 
     return tiles_exist
 
@@ -22,7 +22,11 @@ from time import time
 
 import bpy
 
+from .progress_throttle import ThrottledProgress
 from .time_display import TimeDisplay
+from .logging_setup import setup_logger
+
+logger = setup_logger(__name__)
 
 
 def console_prog(job, progress, total_time="?"):
@@ -45,13 +49,31 @@ def console_prog(job, progress, total_time="?"):
     sys.stdout.flush()
 
 
-class BlenderProgress:
-    def __init__(self, job, debug=True):
+class BlenderProgress(ThrottledProgress):
+    """Reports the progress of a job in Blender's window manager and the console.
+
+    Updates are throttled (see progress_throttle.ThrottledProgress), so it is cheap to call update() on every loop
+    of a generator.
+
+    Methods:
+        __init__ - Sets up the job name and throttling.
+        start - Starts the progress report.
+        report - Sends progress to the window manager and console.
+        finish - Ends the progress report and logs how many updates the throttle skipped.
+        elapsed_time - Returns the time between start and finish.
+    """
+    def __init__(self, job, debug=True, interval=0.1):
+        """Sets up the job name and throttling.
+
+        Args:
+            job - name of the job
+            debug - debug mode (no console progress bar)
+            interval - seconds between reports when the whole percent doesn't change
+        """
+        super().__init__(interval)
         self.job = job
-        self.last_percent = None
         self.debug = debug
         self.elapsed_time_bp = 0
-
         self.s_time = 0
 
     def start(self):
@@ -60,13 +82,11 @@ class BlenderProgress:
         if not self.debug:
             print("\n")
 
-    def update(self, progress):
-        percent = progress * 100
-        if self.last_percent != percent and percent <= 100:
-            bpy.context.window_manager.progress_update(percent)
-            if not self.debug:
-                console_prog(self.job, progress)
-        self.last_percent = percent
+    def report(self, progress):
+        """Sends progress to the window manager and console."""
+        bpy.context.window_manager.progress_update(progress * 100)
+        if not self.debug:
+            console_prog(self.job, progress)
 
     def finish(self):
         self.elapsed_time_bp = time() - self.s_time
@@ -75,5 +95,8 @@ class BlenderProgress:
             print("\n")
         bpy.context.window_manager.progress_end()
 
+        logger.debug("{}: reported {} of {} progress updates ({} skipped)".format(
+            self.job, self.num_reports, self.num_updates, self.num_skipped()))
+
     def elapsed_time(self):
         return self.elapsed_time_bp
@@ -0,0 +1,88 @@
+# Copyright 2017 Integrity Software and Games, LLC
+#
+# ##### BEGIN GPL LICENSE BLOCK ######
+# This file is part of UltiMaze.
+#
+# UltiMaze is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# UltiMaze is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Throttles progress reports without touching bpy (see progress_display.BlenderProgress for the Blender reporter).
+"""
+
+from time import time
+
+
+class ThrottledProgress:
+    """Decides which progress updates are worth reporting.
+
+    Progress is reported when the whole percent changes, or when 'interval' seconds have passed since the last
+    report. The clock is only read every 'check_every' updates within a percent, so skipped updates cost a
+    multiplication, a comparison, and a counter.
+
+    Methods:
+        __init__ - Sets up the throttling.
+        update - Reports progress (a decimal number) if the throttle allows it.
+        report - Sends progress somewhere...only a stub.
+        num_skipped - Returns how many updates were not reported.
+    """
+    def __init__(self, interval=0.1, check_every=256):
+        """Sets up the throttling.
+
+        Args:
+            interval - seconds between reports when the whole percent doesn't change
+            check_every - updates between reads of the clock when the whole percent doesn't change
+        """
+        self.interval = interval
+        self.check_every = check_every
+        self.clock = time
+
+        self.last_whole_percent = None
+        self.last_report_time = 0
+        self.unchecked = 0
+        self.num_updates = 0
+        self.num_reports = 0
+
+    def update(self, progress):
+        """Reports progress (a decimal number) if the throttle allows it."""
+        self.num_updates += 1
+        percent = progress * 100
+        if percent > 100:
+            return
+
+        if int(percent) != self.last_whole_percent:
+            now = self.clock()
+        else:
+            # only look at the clock every so often while the percent stays the same
+            self.unchecked += 1
+            if self.unchecked < self.check_every:
+                return
+            now = self.clock()
+            if now - self.last_report_time < self.interval:
+                self.unchecked = 0
+                return
+
+        self.last_whole_percent = int(percent)
+        self.last_report_time = now
+        self.unchecked = 0
+        self.num_reports += 1
+        self.report(progress)
+
+    def report(self, progress):
+        """Sends progress somewhere...only a stub."""
+        pass
+
+    def num_skipped(self):
+        """Returns how many updates were not reported."""
+        return self.num_updates - self.num_reports
@@ -0,0 +1,58 @@
+# Copyright 2017 Integrity Software and Games, LLC
+#
+# ##### BEGIN GPL LICENSE BLOCK ######
+# This file is part of UltiMaze.
+#
+# UltiMaze is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# UltiMaze is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Opt-in benchmark reporting for the test cases.
+
+Set ULTIMAZE_BENCHMARKS=1 to run the large benchmarks and log the timings that the speed tests measure, e.g.:
+    ULTIMAZE_BENCHMARKS=1 python -m pytest -s testcases
+
+Available Functions:
+    only_benchmarks - Decorator that skips a test unless benchmarks are enabled
+    report - Logs a benchmark result when benchmarks are enabled
+"""
+
+import logging
+import os
+import sys
+import unittest
+
+BENCHMARKS = bool(os.environ.get("ULTIMAZE_BENCHMARKS"))
+
+# decorate a test with this to only run it when benchmarks are enabled
+only_benchmarks = unittest.skipUnless(BENCHMARKS, "set ULTIMAZE_BENCHMARKS=1 to run")
+
+logger = logging.getLogger("ultimaze.benchmarks")
+if BENCHMARKS and not logger.handlers:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def report(message, *args):
+    """Logs a benchmark result when benchmarks are enabled.
+
+    Args:
+        message - (string) format string for the result
+        args - values to format into message
+    """
+    if BENCHMARKS:
+        logger.info(message.format(*args))
@@ -0,0 +1,157 @@
+# Copyright 2017 Integrity Software and Games, LLC
+#
+# ##### BEGIN GPL LICENSE BLOCK ######
+# This file is part of UltiMaze.
+#
+# UltiMaze is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# UltiMaze is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+import random
+import unittest
+
+import image_tools
+from benchmarks import report
+from clock import Clock
+
+
+def random_pixels(width, height, seed=0):
+    rng = random.Random(seed)
+    pixels = []
+    for i in range(width * height):
+        value = float(rng.random() > 0.5)
+        pixels.extend((value, value, value, 1.0))
+    return pixels
+
+
+def per_pixel_text(pixels, width, height):
+    # the operator's original approach: threshold pixel by pixel, then flip row by row
+    maze = ""
+    count = 0
+    while count < len(pixels):
+        if pixels[count] > 0.5:
+            maze += "1"
+        else:
+            maze += "0"
+        count += 4
+
+    flipped_maze = ""
+    row = height - 1
+    while row >= 0:
+        flipped_maze += maze[(row * width):(row * width + width)]
+        row -= 1
+    return flipped_maze
+
+
+def per_pixel_image(text, width, height):
+    # the operator's original approach: four writes per path into a black image
+    pixels = [0.0, 0.0, 0.0, 1.0] * (width * height)
+    image_row = height - 1
+    count = 0
+    while image_row >= 0:
+        image_col = 0
+        while image_col < width:
+            if text[count] == "1":
+                for channel in range(4):
+                    pixels[image_row * width * 4 + image_col * 4 + channel] = 1
+            image_col += 1
+            count += 1
+        image_row -= 1
+    return pixels
+
+
+class TestPixelsToText(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_rows_flipped(self):
+        # bottom row: path, wall, wall...top row: wall, wall, path
+        pixels = [1.0] * 4 + [0.0, 0.0, 0.0, 1.0] * 2 + [0.0, 0.0, 0.0, 1.0] * 2 + [1.0] * 4
+        self.assertEqual(image_tools.pixels_to_text(pixels, 3, 2), "001100")
+
+    def test_red_channel_threshold(self):
+        pixels = [0.6, 0.0, 0.0, 1.0, 0.5, 1.0, 1.0, 1.0]
+        self.assertEqual(image_tools.pixels_to_text(pixels, 2, 1), "10")
+
+    def test_same_as_per_pixel(self):
+        pixels = random_pixels(37, 23)
+        expected = per_pixel_text(pixels, 37, 23)
+        self.assertEqual(image_tools.pixels_to_text(pixels, 37, 23), expected)
+
+        np = image_tools.np
+        image_tools.np = None
+        try:
+            self.assertEqual(image_tools.pixels_to_text(pixels, 37, 23), expected)
+        finally:
+            image_tools.np = np
+
+    @unittest.skipIf(image_tools.np is None, "numpy is not installed")
+    def test_speed(self):
+        pixels = tuple(random_pixels(501, 501))
+
+        clock = Clock("per pixel")
+        expected = per_pixel_text(pixels, 501, 501)
+        per_pixel_time = clock.stop("per pixel")
+
+        clock = Clock("buffer")
+        text = image_tools.pixels_to_text(pixels, 501, 501)
+        buffer_time = clock.stop("buffer")
+
+        report("501x501 image to text: {:.3f}s per pixel, {:.3f}s as one buffer", per_pixel_time, buffer_time)
+        self.assertEqual(text, expected)
+        self.assertLess(buffer_time, per_pixel_time)
+
+
+class TestTextToPixels(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_rows_flipped(self):
+        pixels = image_tools.text_to_pixels("001100", 3, 2)
+        black = [0.0, 0.0, 0.0, 1.0]
+        white = [1.0] * 4
+        self.assertEqual(list(pixels), white + black + black + black + black + white)
+
+    def test_round_trip(self):
+        text = image_tools.pixels_to_text(random_pixels(37, 23), 37, 23)
+        self.assertEqual(image_tools.pixels_to_text(image_tools.text_to_pixels(text, 37, 23), 37, 23), text)
+
+    def test_same_as_per_pixel(self):
+        text = image_tools.pixels_to_text(random_pixels(37, 23), 37, 23)
+        expected = per_pixel_image(text, 37, 23)
+        self.assertEqual(list(image_tools.text_to_pixels(text, 37, 23)), expected)
+
+        np = image_tools.np
+        image_tools.np = None
+        try:
+            self.assertEqual(image_tools.text_to_pixels(text, 37, 23), expected)
+        finally:
+            image_tools.np = np
+
+    @unittest.skipIf(image_tools.np is None, "numpy is not installed")
+    def test_speed(self):
+        text = image_tools.pixels_to_text(random_pixels(501, 501), 501, 501)
+
+        clock = Clock("per pixel")
+        expected = per_pixel_image(text, 501, 501)
+        per_pixel_time = clock.stop("per pixel")
+
+        clock = Clock("buffer")
+        pixels = image_tools.text_to_pixels(text, 501, 501)
+        buffer_time = clock.stop("buffer")
+
+        report("501x501 text to image: {:.3f}s per pixel, {:.3f}s as one buffer", per_pixel_time, buffer_time)
+        self.assertEqual(pixels.tolist(), expected)
+        self.assertLess(buffer_time, per_pixel_time)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+# Copyright 2017 Integrity Software and Games, LLC
+#
+# ##### BEGIN GPL LICENSE BLOCK ######
+# This file is part of UltiMaze.
+#
+# UltiMaze is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# UltiMaze is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import layout_cache
+import maze_tools
+
+
+def make_layout(seed=0, width=21, height=15, storage='LIST'):
+    return maze_tools.DepthFirstMaze(debug=False, width=width, height=height, bias_direction='', bias=0.0,
+                                     storage=storage, seed=seed).maze
+
+
+class TestLayoutKey(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_order_doesnt_matter(self):
+        settings = {'algorithm': 'DEPTH_FIRST', 'width': 21, 'height': 15, 'seed': 3}
+        reordered = {'seed': 3, 'height': 15, 'width': 21, 'algorithm': 'DEPTH_FIRST'}
+        self.assertEqual(layout_cache.layout_key(settings), layout_cache.layout_key(reordered))
+
+    def test_every_setting_matters(self):
+        settings = {'algorithm': 'DEPTH_FIRST', 'width': 21, 'height': 15, 'bias': 0.0, 'seed': 3}
+        key = layout_cache.layout_key(settings)
+        for name, value in (('algorithm', 'PRIMS'), ('width', 23), ('height', 17), ('bias', 0.5), ('seed', 4)):
+            changed = dict(settings)
+            changed[name] = value
+            self.assertNotEqual(key, layout_cache.layout_key(changed), name)
+
+
+class TestPackLayout(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_round_trip(self):
+        for storage in maze_tools.MAZE_STORAGE:
+            maze = make_layout(storage=storage)
+            for out_storage in maze_tools.MAZE_STORAGE:
+                unpacked = layout_cache.unpack_layout(layout_cache.pack_layout(maze), out_storage)
+                self.assertIsInstance(unpacked, maze_tools.MAZE_STORAGE[out_storage])
+                self.assertEqual((unpacked.width, unpacked.height), (maze.width, maze.height))
+                for x in range(maze.width):
+                    for y in range(maze.height):
+                        self.assertEqual(bool(unpacked.is_path(x, y)), bool(maze.is_path(x, y)))
+
+    def test_compact(self):
+        maze = make_layout(width=101, height=101)
+        self.assertEqual(len(layout_cache.pack_layout(maze)), layout_cache.HEADER.size + (101 * 101 + 7) // 8)
+
+    def test_bad_data(self):
+        data = layout_cache.pack_layout(make_layout())
+        self.assertIsNone(layout_cache.unpack_layout(b''))
+        self.assertIsNone(layout_cache.unpack_layout(data[:-1]))
+        self.assertIsNone(layout_cache.unpack_layout(b'NOPE' + data[4:]))
+
+
+class TestLayoutCacheFolder(unittest.TestCase):
+    maxDiff = 10000
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_store_and_load(self):
+        maze = make_layout()
+        self.assertIsNone(layout_cache.load_layout('abc', self.folder))
+        layout_cache.store_layout('abc', maze, self.folder)
+        loaded = layout_cache.load_layout('abc', self.folder, 'LIST')
+        self.assertEqual(loaded.get_maze(), maze.get_maze())
+
+    def test_corrupt_file(self):
+        with open(os.path.join(self.folder, 'abc' + layout_cache.EXTENSION), 'wb') as f:
+            f.write(b'garbage')
+        self.assertIsNone(layout_cache.load_layout('abc', self.folder))
+
+    def test_evicts_least_recently_used(self):
+        size = len(layout_cache.pack_layout(make_layout()))
+        for i, key in enumerate(('a', 'b', 'c')):
+            layout_cache.store_layout(key, make_layout(seed=i), self.folder)
+            path = os.path.join(self.folder, key + layout_cache.EXTENSION)
+            os.utime(path, (1000 + i, 1000 + i))
+
+        # use 'a' so 'b' becomes the least recently used
+        self.assertIsNotNone(layout_cache.load_layout('a', self.folder))
+
+        evicted = layout_cache.evict(self.folder, max_bytes=size * 2)
+        self.assertEqual(evicted, ['b'])
+        self.assertIsNotNone(layout_cache.load_layout('a', self.folder))
+        self.assertIsNone(layout_cache.load_layout('b', self.folder))
+        self.assertIsNotNone(layout_cache.load_layout('c', self.folder))
+
+    def test_unwritable_folder(self):
+        # a file where the cache folder should be makes every write fail
+        folder = os.path.join(self.folder, 'not_a_folder')
+        with open(folder, 'w') as f:
+            f.write('')
+        self.assertFalse(layout_cache.store_layout('abc', make_layout(), folder))
+        self.assertIsNone(layout_cache.load_layout('abc', folder))
+
+    def test_read_only_hit(self):
+        maze = make_layout()
+        layout_cache.store_layout('abc', maze, self.folder)
+        with mock.patch.object(layout_cache.os, 'utime', side_effect=PermissionError("read-only")):
+            loaded = layout_cache.load_layout('abc', self.folder, 'LIST')
+        self.assertEqual(loaded.get_maze(), maze.get_maze())
+
+    def test_store_respects_cap(self):
+        size = len(layout_cache.pack_layout(make_layout()))
+        for i in range(5):
+            layout_cache.store_layout(str(i), make_layout(seed=i), self.folder, max_bytes=size * 3)
+        self.assertEqual(len(os.listdir(self.folder)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
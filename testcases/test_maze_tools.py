@@ -17,9 +17,13 @@
 # along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
 # ##### END GPL LICENSE BLOCK #####
 
+import io
+import random
 import unittest
+from collections import deque
 
 import maze_tools
+from benchmarks import only_benchmarks, report
 from clock import Clock
 
 
@@ -46,14 +50,341 @@ class TestMaze(unittest.TestCase):
 
         self.assertEqual(maze.get_maze(), expected)
 
+    def test_storage_items(self):
+        self.assertEqual([item[0] for item in maze_tools.STORAGE_ITEMS], list(maze_tools.MAZE_STORAGE))
+
+    def test_missing_storage_falls_back(self):
+        self.assertIs(maze_tools.storage_class('NOPE'), maze_tools.ByteMaze)
+        maze = maze_tools.DepthFirstMaze(debug=False, width=11, height=11, bias_direction='', bias=0.0,
+                                         storage='NOPE')
+        self.assertIsInstance(maze.maze, maze_tools.ByteMaze)
+
     def test_make_base_grid_speed(self):
-        clock = Clock("Init Maze")
-        maze_tools.Maze(2500, 2500)
-        result = clock.stop("Init Maze")
+        sizes = {}
+        for storage in ('LIST', 'BYTES', 'BITS'):
+            clock = Clock("Init Maze")
+            maze = maze_tools.MAZE_STORAGE[storage](2500, 2500)
+            result = clock.stop("Init Maze")
+            sizes[storage] = maze.size_in_bytes()
+            report("{:>5} 2500x2500: {:.4f} seconds, {:>10} bytes", storage, result, sizes[storage])
+
+            self.assertLessEqual(result, 1)
+
+        self.assertLess(sizes['BYTES'], sizes['LIST'])
+        self.assertLess(sizes['BITS'], sizes['BYTES'])
+
+
+class TestMazeStorage(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_get_maze_matches_list(self):
+        for storage in ('BYTES', 'BITS'):
+            for walls in (True, False):
+                maze = maze_tools.MAZE_STORAGE[storage](7, 5, walls)
+                self.assertEqual(maze.get_maze(), maze_tools.Maze(7, 5, walls).get_maze())
+
+    def test_make_path_and_wall(self):
+        for storage in ('LIST', 'BYTES', 'BITS'):
+            maze = maze_tools.MAZE_STORAGE[storage](7, 5)
+            maze.make_path(3, 4)
+            maze.make_path(6, 0)
+            maze.make_path(0, 1)
+            maze.make_wall(0, 1)
+
+            self.assertTrue(maze.is_path(3, 4))
+            self.assertTrue(maze.is_path(6, 0))
+            self.assertFalse(maze.is_path(0, 1))
+            self.assertFalse(maze.is_path(3, 3))
+            self.assertEqual(len(maze), 7)
+
+    def test_find_touching_path_dirs(self):
+        for storage in ('BYTES', 'BITS'):
+            maze = maze_tools.MAZE_STORAGE[storage](10, 10)
+            for i in range(5):
+                for j in range(5):
+                    maze.make_path(i, j)
+            self.assertEqual(maze.find_touching_path_dirs(1, 1), ['N', 'W', 'E', 'S'])
+            self.assertEqual(maze.find_touching_path_dirs(4, 4), ['W', 'S'])
+
+
+@unittest.skipIf(maze_tools.np is None, "numpy is not installed")
+class TestNeighborMask(unittest.TestCase):
+    maxDiff = 10000
+
+    @staticmethod
+    def make_random_maze(storage):
+        rng = random.Random(7)
+        maze = maze_tools.MAZE_STORAGE[storage](13, 9)
+        for x in range(maze.width):
+            for y in range(maze.height):
+                if rng.random() > 0.5:
+                    maze.make_path(x, y)
+        return maze
+
+    def test_as_array_matches_get_maze(self):
+        for storage in maze_tools.MAZE_STORAGE:
+            maze = self.make_random_maze(storage)
+            self.assertEqual(maze.as_array().tolist(), maze.get_maze())
+
+    def test_load_array_round_trip(self):
+        expected = self.make_random_maze('LIST').get_maze()
+        for storage in maze_tools.MAZE_STORAGE:
+            maze = maze_tools.MAZE_STORAGE[storage](13, 9)
+            maze.load_array(maze_tools.np.array(expected))
+            self.assertEqual(maze.get_maze(), expected)
+
+    def test_matches_find_touching_path_dirs(self):
+        for storage in maze_tools.MAZE_STORAGE:
+            maze = self.make_random_maze(storage)
+            for dist in (1, 2, 9, 13):
+                mask = maze.neighbor_mask(dist)
+                for x in range(maze.width):
+                    for y in range(maze.height):
+                        expected = maze.find_touching_path_dirs(x, y, dist)
+                        self.assertEqual(maze_tools.mask_to_dirs(mask[x, y]), expected)
+                        self.assertEqual(maze_tools.dirs_to_mask(expected), mask[x, y])
+
+    def test_speed(self):
+        maze = maze_tools.ArrayMaze(2500, 2500, False)
+        clock = Clock("Neighbor Mask")
+        maze.neighbor_mask()
+        result = clock.stop("Neighbor Mask")
 
         self.assertLessEqual(result, 1)
 
 
+def count_loops_and_regions(maze):
+    """Returns (number of independent loops, number of separate regions) in the maze's paths."""
+    spaces = 0
+    links = 0
+    regions = 0
+    seen = set()
+    for x in range(maze.width):
+        for y in range(maze.height):
+            if not maze.is_path(x, y):
+                continue
+            spaces += 1
+            # count each link once by only looking east and north
+            links += sum(1 for d in ('N', 'E') if d in maze.find_touching_path_dirs(x, y))
+            if (x, y) not in seen:
+                regions += 1
+                stack = [(x, y)]
+                seen.add((x, y))
+                while stack:
+                    space = stack.pop()
+                    for t in maze.find_exist_touching(*space):
+                        if t not in seen and maze.is_path(*t):
+                            seen.add(t)
+                            stack.append(t)
+
+    return links - spaces + regions, regions
+
+
+class TestSetBasedMazes(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_kruskals_is_perfect(self):
+        maze = maze_tools.KruskalsMaze(debug=False, width=41, height=31).get()
+        self.assertEqual(count_loops_and_regions(maze), (0, 1))
+
+    def test_ellers_is_perfect(self):
+        for bias in (0.0, 0.5, 0.9):
+            maze = maze_tools.EllersMaze(bias=bias, debug=False, width=41, height=31).get()
+            self.assertEqual(count_loops_and_regions(maze), (0, 1))
+
+    def test_ellers_row_scaling(self):
+        times = []
+        for width in (501, 4001):
+            clock = Clock("Eller's")
+            maze_tools.EllersMaze(bias=0.5, debug=False, width=width, height=9, storage='BYTES')
+            times.append(clock.stop("Eller's") / width)
+            report("Eller's {}x9: {:.2f} us per column", width, times[-1] * 1e6)
+
+        # each row should take time proportional to the width
+        self.assertLess(times[1] / times[0], 3)
+
+
+class TestBinaryTreeMaze(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_loop_is_perfect(self):
+        for directions in ('NE', 'NW', 'SE', 'SW'):
+            maze = maze_tools.BinaryTreeMaze(directions, debug=False, width=41, height=31).get()
+            self.assertEqual(count_loops_and_regions(maze), (0, 1))
+
+    @unittest.skipIf(maze_tools.np is None, "numpy is not installed")
+    def test_vectorized_is_perfect(self):
+        for directions in ('NE', 'NW', 'SE', 'SW'):
+            for storage in maze_tools.MAZE_STORAGE:
+                maze = maze_tools.BinaryTreeMaze(directions, vectorized=True, debug=False, width=41, height=31,
+                                                 storage=storage).get()
+                self.assertEqual(count_loops_and_regions(maze), (0, 1))
+
+    @unittest.skipIf(maze_tools.np is None, "numpy is not installed")
+    def test_vectorized_tileable(self):
+        for directions in ('NE', 'NW', 'SE', 'SW'):
+            maze = maze_tools.BinaryTreeMaze(directions, tileable=True, vectorized=True, debug=False,
+                                             width=41, height=31).get()
+            for x in range(maze.width):
+                for y in range(maze.height):
+                    # every even space is a path and every odd/odd space is a wall
+                    if not x & 1 and not y & 1:
+                        self.assertTrue(maze.is_path(x, y))
+                    elif x & 1 and y & 1:
+                        self.assertFalse(maze.is_path(x, y))
+
+            # one passage per even space, except the ones that pointed off the edge
+            paths = sum(maze.is_path(x, y) for x in range(maze.width) for y in range(maze.height))
+            self.assertLessEqual(paths, 2 * 21 * 16)
+            self.assertEqual(count_loops_and_regions(maze)[0], 0)
+
+    @unittest.skipIf(maze_tools.np is None, "numpy is not installed")
+    def test_vectorized_speed(self):
+        clock = Clock("Loop")
+        maze_tools.BinaryTreeMaze('NE', debug=False, width=1001, height=1001, storage='ARRAY')
+        loop_time = clock.stop("Loop")
+
+        clock = Clock("Vectorized")
+        maze_tools.BinaryTreeMaze('NE', vectorized=True, debug=False, width=1001, height=1001, storage='ARRAY')
+        vectorized_time = clock.stop("Vectorized")
+
+        report("Binary tree 1001x1001: loop {:.4f} seconds, vectorized {:.4f} seconds", loop_time, vectorized_time)
+        self.assertLess(vectorized_time, loop_time)
+
+
+class TestSeeds(unittest.TestCase):
+    maxDiff = 10000
+
+    @staticmethod
+    def make_mazes(seed):
+        kwargs = {'debug': False, 'width': 31, 'height': 21, 'seed': seed}
+        mazes = [maze_tools.DepthFirstMaze(bias_direction='RANDOM', bias=0.5, **kwargs),
+                 maze_tools.BreadthFirstMaze(bias_direction='RANDOM', bias=0.5, **kwargs),
+                 maze_tools.PrimsMaze(bias_direction='RANDOM', bias=0.5, **kwargs),
+                 maze_tools.BinaryTreeMaze(**kwargs),
+                 maze_tools.KruskalsMaze(**kwargs),
+                 maze_tools.EllersMaze(bias=0.5, **kwargs)]
+        if maze_tools.np is not None:
+            mazes.append(maze_tools.BinaryTreeMaze(vectorized=True, **kwargs))
+        return [m.get().get_maze() for m in mazes]
+
+    def test_same_seed_same_maze(self):
+        self.assertEqual(self.make_mazes(42), self.make_mazes(42))
+
+    def test_different_seed_different_maze(self):
+        for maze1, maze2 in zip(self.make_mazes(1), self.make_mazes(2)):
+            self.assertNotEqual(maze1, maze2)
+
+    def test_rng_instance(self):
+        maze1 = maze_tools.KruskalsMaze(debug=False, width=31, height=21, rng=random.Random(5)).get()
+        maze2 = maze_tools.KruskalsMaze(debug=False, width=31, height=21, seed=5).get()
+        self.assertEqual(maze1.get_maze(), maze2.get_maze())
+
+    def test_ellers_rows(self):
+        rows1 = list(maze_tools.ellers_rows(31, 21, 0.5, random.Random(3)))
+        rows2 = list(maze_tools.ellers_rows(31, 21, 0.5, random.Random(3)))
+        self.assertEqual(rows1, rows2)
+
+
+class TestEllersRows(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_rows_make_perfect_maze(self):
+        for height in (31, 32):
+            maze = maze_tools.Maze(41, height)
+            num_rows = 0
+            for y, row in enumerate(maze_tools.ellers_rows(41, height, 0.5)):
+                self.assertEqual(len(row), 41)
+                for x in range(41):
+                    if row[x]:
+                        maze.make_path(x, y)
+                num_rows += 1
+
+            self.assertEqual(num_rows, height)
+            self.assertEqual(count_loops_and_regions(maze), (0, 1))
+
+    def test_rows_are_streamed(self):
+        # would never finish if the whole maze was built before the first row
+        rows = maze_tools.ellers_rows(101, 10 ** 9)
+        self.assertEqual(len(next(rows)), 101)
+        self.assertEqual(len(next(rows)), 101)
+
+    def test_write_rows(self):
+        stream = io.StringIO()
+        rows = [bytearray([1, 1, 1]), bytearray([0, 0, 1]), bytearray([1, 1, 1])]
+        self.assertEqual(maze_tools.write_rows(rows, stream), 3)
+        self.assertEqual(stream.getvalue(), "111001111")
+
+
+class CountingList(list):
+    """Frontier list that counts the cells shifted by removals (the cost of list.pop(index))."""
+
+    def __init__(self):
+        super().__init__()
+        self.shifted = 0
+
+    def pop(self, index=-1):
+        self.shifted += len(self) - 1 - (index % len(self))
+        return super().pop(index)
+
+    def popleft(self):
+        return self.pop(0)
+
+
+def counting_maze(maze_class, old_removal=False):
+    """Returns a subclass of maze_class with a CountingList frontier, removing cells with list.pop(index) if
+    old_removal (how every algorithm removed cells before remove_cell was overridden)."""
+
+    class CountingMaze(maze_class):
+        def make_frontier(self):
+            return CountingList()
+
+        def remove_cell(self, index):
+            if old_removal:
+                self.cells.pop(index)
+            else:
+                super().remove_cell(index)
+
+    return CountingMaze
+
+
+class TestFrontierScaling(unittest.TestCase):
+    maxDiff = 10000
+
+    def shifted(self, maze_class, old_removal=False, size=101):
+        maze = counting_maze(maze_class, old_removal)(bias_direction='RANDOM', bias=0, debug=False, width=size,
+                                                      height=size, seed=0)
+        return maze.cells.shifted
+
+    def test_prims_removal_shifts_nothing(self):
+        self.assertEqual(self.shifted(maze_tools.PrimsMaze), 0)
+        # the old removal shifted more cells than the maze has spaces
+        self.assertGreater(self.shifted(maze_tools.PrimsMaze, old_removal=True), 101 * 101)
+
+    def test_breadth_first_removal_shifts_nothing(self):
+        self.assertIsInstance(maze_tools.BreadthFirstMaze(bias_direction='RANDOM', bias=0, debug=False, width=11,
+                                                          height=11).cells, deque)
+        # removing from the front of a list shifts the whole frontier every time
+        self.assertGreater(self.shifted(maze_tools.BreadthFirstMaze, old_removal=True), 101 * 101)
+
+    def time_per_space(self, maze_class, size):
+        clock = Clock("Make Maze")
+        maze_class(bias_direction='RANDOM', bias=0, debug=False, width=size, height=size, storage='BYTES')
+        return clock.stop("Make Maze") / (size * size)
+
+    @only_benchmarks
+    def test_large_mazes_near_linear(self):
+        for maze_class in (maze_tools.BreadthFirstMaze, maze_tools.PrimsMaze):
+            small = self.time_per_space(maze_class, 101)
+            for size in (1001, 2001, 4001):
+                large = self.time_per_space(maze_class, size)
+                report("{} {}x{}: {:.2f} us per space ({:.2f} at 101x101)", maze_class.__name__, size, size,
+                       large * 1e6, small * 1e6)
+
+                # quadratic frontier removal would make this ratio grow with the grid size
+                self.assertLess(large / small, 3)
+
+
 class TestFindTouchingAndExist(unittest.TestCase):
     maxDiff = 10000
 
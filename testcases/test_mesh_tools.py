@@ -0,0 +1,550 @@
+# Copyright 2017 Integrity Software and Games, LLC
+#
+# ##### BEGIN GPL LICENSE BLOCK ######
+# This file is part of UltiMaze.
+#
+# UltiMaze is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# UltiMaze is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+import math
+import random
+import unittest
+from collections import Counter
+
+import maze_tools
+import mesh_tools
+from benchmarks import only_benchmarks, report
+from clock import Clock
+
+try:
+    import bpy
+    import bmesh
+except ImportError:
+    bpy = None
+
+
+def make_maze(width=15, height=11, seed=0):
+    return maze_tools.DepthFirstMaze(debug=False, width=width, height=height, bias_direction='', bias=0.0,
+                                     seed=seed).maze
+
+
+def quad_corners(coords, quads):
+    """Returns the quads as a set of frozensets of vertex coordinates."""
+    verts = [tuple(coords[i:i + 3]) for i in range(0, len(coords), 3)]
+    return {frozenset(verts[v] for v in quads[i:i + 4]) for i in range(0, len(quads), 4)}
+
+
+def separate_quads(maze):
+    """The old Make3DMaze: 4 new vertices for every floor, top and side quad."""
+    quads = set()
+
+    def add(*verts):
+        quads.add(frozenset(verts))
+
+    for x in range(maze.width):
+        for y in range(maze.height):
+            z = 0 if maze.is_path(x, y) else 1
+            add((x - 0.5, -(y + 0.5), z), (x + 0.5, -(y + 0.5), z), (x + 0.5, -(y - 0.5), z), (x - 0.5, -(y - 0.5), z))
+            if z == 0:
+                continue
+            for d in maze.find_touching(x, y):
+                if maze.exist_test(d[0], d[1]) and maze.is_path(d[0], d[1]):
+                    if d[0] == x:
+                        y_avg = -((d[1] + y) / 2)
+                        add((x - 0.5, y_avg, 1), (x + 0.5, y_avg, 1), (x + 0.5, y_avg, 0), (x - 0.5, y_avg, 0))
+                    else:
+                        x_avg = (d[0] + x) / 2
+                        add((x_avg, -(y - 0.5), 1), (x_avg, -(y + 0.5), 1), (x_avg, -(y + 0.5), 0),
+                            (x_avg, -(y - 0.5), 0))
+    return quads
+
+
+def unit_pieces(coords, quads):
+    """Returns a Counter of the unit squares covered by the quads, to compare meshes with different quad sizes."""
+    pieces = Counter()
+    for q in range(0, len(quads), 4):
+        verts = [coords[v * 3:v * 3 + 3] for v in quads[q:q + 4]]
+        lo = [min(v[a] for v in verts) for a in range(3)]
+        hi = [max(v[a] for v in verts) for a in range(3)]
+        flat = [a for a in range(3) if lo[a] == hi[a]][0]
+        a1, a2 = [a for a in range(3) if a != flat]
+        for s1 in range(int(hi[a1] - lo[a1])):
+            for s2 in range(int(hi[a2] - lo[a2])):
+                pieces[(flat, lo[flat], lo[a1] + s1, lo[a2] + s2)] += 1
+    return pieces
+
+
+def check_winding(test, maze, mesh):
+    """Checks that floors and tops face up and every side faces from its wall into a path."""
+    coords = mesh.coords
+    for q in range(0, len(mesh.quads), 4):
+        v = [coords[i * 3:i * 3 + 3] for i in mesh.quads[q:q + 4]]
+
+        # Newell's method
+        normal = [0, 0, 0]
+        for a, b in zip(v, v[1:] + v[:1]):
+            normal[0] += (a[1] - b[1]) * (a[2] + b[2])
+            normal[1] += (a[2] - b[2]) * (a[0] + b[0])
+            normal[2] += (a[0] - b[0]) * (a[1] + b[1])
+
+        if v[0][2] == v[1][2] == v[2][2]:
+            test.assertGreater(normal[2], 0)
+            continue
+
+        # a point just inside the quad, stepped to both sides of it
+        point = [v[0][a] + 0.25 * ((v[2][a] > v[0][a]) - (v[2][a] < v[0][a])) for a in range(3)]
+        length = sum(n * n for n in normal) ** 0.5
+        front = [point[a] + 0.5 * normal[a] / length for a in range(3)]
+        back = [point[a] - 0.5 * normal[a] / length for a in range(3)]
+        test.assertTrue(maze.is_path(round(front[0]), round(-front[1])))
+        test.assertFalse(maze.is_path(round(back[0]), round(-back[1])))
+
+
+class TestQuadMesh(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_corner_made_once(self):
+        mesh = mesh_tools.QuadMesh(2, 2)
+        mesh.add_quad((0, 1, 0), (1, 1, 0), (1, 0, 0), (0, 0, 0))
+        mesh.add_quad((1, 1, 0), (2, 1, 0), (2, 0, 0), (1, 0, 0))
+        self.assertEqual(mesh.num_verts(), 6)
+        self.assertEqual(mesh.num_quads(), 2)
+        self.assertEqual(list(mesh.quads), [0, 1, 2, 3, 1, 4, 5, 2])
+
+    def test_corner_coords(self):
+        mesh = mesh_tools.QuadMesh(3, 3)
+        vert = mesh.corner(2, 3, 1)
+        self.assertEqual(tuple(mesh.coords[vert * 3:vert * 3 + 3]), (1.5, -2.5, 1.0))
+        self.assertEqual(mesh.corner(2, 3, 1), vert)
+        self.assertNotEqual(mesh.corner(2, 3, 0), vert)
+
+    def test_rolling_same_as_full(self):
+        maze = make_maze(width=23, height=17)
+        for region in ((0, 0, 23, 17), (5, 3, 16, 11)):
+            x0, y0, x1, y1 = region
+            full = mesh_tools.QuadMesh(x1 - x0, y1 - y0, (x0, y0))
+            rolling = mesh_tools.QuadMesh(x1 - x0, y1 - y0, (x0, y0), rolling=True)
+            for x in range(x0, x1):
+                rolling.start_column(x)
+                for y in range(y0, y1):
+                    for mesh in (full, rolling):
+                        # every corner of the space at both heights, in a column by column order
+                        mesh.add_quad((x, y + 1, 0), (x + 1, y + 1, 0), (x + 1, y, 0), (x, y, 0))
+                        mesh.add_quad((x, y, 1), (x, y + 1, 1), (x + 1, y + 1, 1), (x + 1, y, 1))
+            self.assertEqual((list(rolling.coords), list(rolling.quads)), (list(full.coords), list(full.quads)))
+            self.assertEqual(len(rolling.corner_verts), 2 * 2 * (y1 - y0 + 1))
+
+    def test_corner_lookup_size(self):
+        mesh = mesh_tools.QuadMesh(100, 50)
+        self.assertEqual(mesh.corner_verts.itemsize, 4)
+        self.assertEqual(len(mesh.corner_verts), 2 * 101 * 51)
+
+
+class TestMeshBuffers(unittest.TestCase):
+    """The flat buffers Make3DMaze loads into a mesh with foreach_set."""
+    maxDiff = 10000
+
+    def check_buffers(self, coords, quads):
+        num_verts = len(coords) // 3
+        self.assertEqual(len(coords), num_verts * 3)
+        self.assertEqual(len(quads) % 4, 0)
+        # every quad index points at a vertex and every vertex is used
+        self.assertEqual(set(int(i) for i in quads), set(range(num_verts)))
+        # no quad uses a vertex twice
+        for q in range(0, len(quads), 4):
+            self.assertEqual(len(set(quads[q:q + 4])), 4)
+
+    def test_maze_quads_buffers(self):
+        for merge in (False, True):
+            mesh = mesh_tools.maze_quads(make_maze(), merge=merge)
+            self.assertEqual((mesh.coords.typecode, mesh.quads.typecode), ('f', 'i'))
+            self.check_buffers(mesh.coords, mesh.quads)
+
+    @unittest.skipIf(mesh_tools.np is None, "numpy is not installed")
+    def test_grid_quads_buffers(self):
+        coords, quads = mesh_tools.grid_quads(make_maze())
+        self.assertEqual((coords.dtype.name, quads.dtype.name), ('float32', 'int32'))
+        self.check_buffers(coords.tolist(), quads.tolist())
+
+    def test_quad_loops(self):
+        loop_start, loop_total = mesh_tools.quad_loops(3)
+        self.assertEqual((loop_start.typecode, loop_total.typecode), ('i', 'i'))
+        self.assertEqual((list(loop_start), list(loop_total)), ([0, 4, 8], [4, 4, 4]))
+
+    @only_benchmarks
+    @unittest.skipIf(bpy is None, "needs Blender's python (bpy)")
+    def test_foreach_set_vs_bmesh(self):
+        for size in (501, 1001):
+            mesh = mesh_tools.maze_quads(maze_tools.KruskalsMaze(debug=False, width=size, height=size,
+                                                                 storage='BYTES', seed=0).maze)
+            num_verts = mesh.num_verts()
+
+            # the old path: one bmesh call per vertex and per face
+            clock = Clock("bmesh")
+            bm = bmesh.new()
+            verts = [bm.verts.new(mesh.coords[i:i + 3]) for i in range(0, len(mesh.coords), 3)]
+            for q in range(0, len(mesh.quads), 4):
+                bm.faces.new([verts[i] for i in mesh.quads[q:q + 4]])
+            me_bmesh = bpy.data.meshes.new("bmesh")
+            bm.to_mesh(me_bmesh)
+            bm.free()
+            bmesh_time = clock.stop("bmesh")
+
+            # the fast path: bulk foreach_set of the flat buffers (like bmesh_maze_gen.quad_mesh_data)
+            clock = Clock("foreach_set")
+            me = bpy.data.meshes.new("foreach_set")
+            me.vertices.add(num_verts)
+            me.loops.add(len(mesh.quads))
+            me.polygons.add(mesh.num_quads())
+            me.vertices.foreach_set("co", mesh.coords)
+            me.loops.foreach_set("vertex_index", mesh.quads)
+            loop_start, loop_total = mesh_tools.quad_loops(mesh.num_quads())
+            me.polygons.foreach_set("loop_start", loop_start)
+            me.polygons.foreach_set("loop_total", loop_total)
+            me.update(calc_edges=True)
+            foreach_time = clock.stop("foreach_set")
+
+            report("{}x{} maze, {} quads: bmesh {:.3f}s, foreach_set {:.3f}s", size, size, mesh.num_quads(),
+                   bmesh_time, foreach_time)
+            self.assertEqual(len(me.polygons), len(me_bmesh.polygons))
+            self.assertLess(foreach_time, bmesh_time)
+
+            bpy.data.meshes.remove(me)
+            bpy.data.meshes.remove(me_bmesh)
+
+
+class TestMazeQuads(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_same_quads_as_separate(self):
+        for seed in range(3):
+            maze = make_maze(seed=seed)
+            mesh = mesh_tools.maze_quads(maze)
+            self.assertEqual(quad_corners(mesh.coords, mesh.quads), separate_quads(maze))
+
+    def test_no_doubles(self):
+        mesh = mesh_tools.maze_quads(make_maze())
+        verts = [tuple(mesh.coords[i:i + 3]) for i in range(0, len(mesh.coords), 3)]
+        self.assertEqual(len(verts), len(set(verts)))
+
+    def test_winding(self):
+        maze = make_maze()
+        check_winding(self, maze, mesh_tools.maze_quads(maze))
+
+    def test_progress(self):
+        steps = []
+        mesh_tools.maze_quads(make_maze(width=5, height=5), steps.append)
+        self.assertEqual(steps, [0, 0.2, 0.4, 0.6, 0.8])
+
+
+class TestGreedyRectangles(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_cover_once(self):
+        mask = mesh_tools.path_mask(make_maze(21, 17))
+        covered = bytearray(len(mask))
+        for x0, y0, x1, y1 in mesh_tools.greedy_rectangles(mask, 21, 17):
+            for x in range(x0, x1):
+                for y in range(y0, y1):
+                    self.assertEqual(covered[x * 17 + y], 0)
+                    covered[x * 17 + y] = 1
+        self.assertEqual(covered, mask)
+
+    def test_full_grid(self):
+        self.assertEqual(list(mesh_tools.greedy_rectangles(b'\x01' * 12, 3, 4)), [(0, 0, 3, 4)])
+
+    def test_runs(self):
+        self.assertEqual(list(mesh_tools.runs([1, 1, 0, 1, 0, 0, 1, 1, 1])), [(0, 2), (3, 4), (6, 9)])
+        self.assertEqual(list(mesh_tools.runs([])), [])
+
+
+class TestMergedMazeQuads(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_same_surface(self):
+        for seed in range(3):
+            maze = make_maze(seed=seed)
+            mesh = mesh_tools.maze_quads(maze)
+            merged = mesh_tools.maze_quads(maze, merge=True)
+            self.assertEqual(unit_pieces(merged.coords, merged.quads), unit_pieces(mesh.coords, mesh.quads))
+            self.assertLess(merged.num_quads(), mesh.num_quads())
+
+    def test_winding(self):
+        maze = make_maze()
+        check_winding(self, maze, mesh_tools.maze_quads(maze, merge=True))
+
+    def test_same_without_numpy(self):
+        maze = make_maze()
+        merged = mesh_tools.maze_quads(maze, merge=True)
+        np = mesh_tools.np
+        mesh_tools.np = None
+        try:
+            self.assertEqual(mesh_tools.maze_quads(maze, merge=True).quads, merged.quads)
+        finally:
+            mesh_tools.np = np
+
+    def test_reduction(self):
+        maze = maze_tools.KruskalsMaze(debug=False, width=301, height=301, seed=0).maze
+
+        clock = Clock("separate")
+        mesh = mesh_tools.maze_quads(maze)
+        separate_time = clock.stop("separate")
+
+        clock = Clock("merged")
+        merged = mesh_tools.maze_quads(maze, merge=True)
+        merged_time = clock.stop("merged")
+
+        report("301x301 maze: {} quads / {} verts in {:.3f}s separate, {} quads / {} verts in {:.3f}s merged",
+               mesh.num_quads(), mesh.num_verts(), separate_time, merged.num_quads(), merged.num_verts(), merged_time)
+        self.assertLess(merged.num_quads(), mesh.num_quads() / 2)
+
+
+class TestChunks(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_chunk_ranges(self):
+        self.assertEqual(list(mesh_tools.chunk_ranges(5, 3, 2)),
+                         [(0, 0, 2, 2), (0, 2, 2, 3), (2, 0, 4, 2), (2, 2, 4, 3), (4, 0, 5, 2), (4, 2, 5, 3)])
+        self.assertEqual(list(mesh_tools.chunk_ranges(4, 4, 8)), [(0, 0, 4, 4)])
+
+    def test_chunks_make_whole_maze(self):
+        maze = make_maze(width=23, height=17)
+        for merge in (False, True):
+            whole = mesh_tools.maze_quads(maze, merge=merge)
+            pieces = Counter()
+            for region in mesh_tools.chunk_ranges(maze.width, maze.height, 6):
+                chunk = mesh_tools.maze_quads(maze, merge=merge, region=region)
+                pieces += unit_pieces(chunk.coords, chunk.quads)
+
+                # every vertex stays on the region's corners
+                x0, y0, x1, y1 = region
+                for i in range(0, len(chunk.coords), 3):
+                    self.assertTrue(x0 - 0.5 <= chunk.coords[i] <= x1 - 0.5)
+                    self.assertTrue(y0 - 0.5 <= -chunk.coords[i + 1] <= y1 - 0.5)
+            self.assertEqual(pieces, unit_pieces(whole.coords, whole.quads))
+
+    def test_chunk_winding(self):
+        maze = make_maze(width=23, height=17)
+        for merge in (False, True):
+            for region in mesh_tools.chunk_ranges(maze.width, maze.height, 6):
+                check_winding(self, maze, mesh_tools.maze_quads(maze, merge=merge, region=region))
+
+
+class TestMazeLods(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_lods_match_builders(self):
+        maze = make_maze(width=23, height=17)
+        for region in (None, (6, 6, 12, 12)):
+            lods = mesh_tools.maze_lods(maze, region=region)
+            full = mesh_tools.maze_quads(maze, region=region)
+            merged = mesh_tools.maze_quads(maze, merge=True, region=region)
+            self.assertEqual(quad_corners(lods['FULL'].coords, lods['FULL'].quads), quad_corners(full.coords, full.quads))
+            self.assertEqual(lods['MERGED'].num_quads(), merged.num_quads())
+            self.assertEqual(unit_pieces(lods['MERGED'].coords, lods['MERGED'].quads),
+                             unit_pieces(merged.coords, merged.quads))
+            check_winding(self, maze, lods['FULL'])
+            check_winding(self, maze, lods['MERGED'])
+
+    def test_heightfield(self):
+        maze = make_maze(width=23, height=17)
+        lods = mesh_tools.maze_lods(maze)
+        heightfield = lods['HEIGHTFIELD']
+
+        # only flat quads, covering every space once
+        pieces = unit_pieces(heightfield.coords, heightfield.quads)
+        self.assertEqual(sum(pieces.values()), 23 * 17)
+        self.assertTrue(all(flat == 2 for flat, _, _, _ in pieces))
+        self.assertLess(heightfield.num_quads(), lods['MERGED'].num_quads())
+
+
+@unittest.skipIf(mesh_tools.np is None, "numpy is not installed")
+class TestGridQuads(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_same_quads_as_cells(self):
+        for storage in maze_tools.MAZE_STORAGE:
+            maze = maze_tools.KruskalsMaze(debug=False, width=23, height=17, storage=storage, seed=1).maze
+            mesh = mesh_tools.maze_quads(maze)
+            coords, quads = mesh_tools.grid_quads(maze)
+            self.assertEqual(quad_corners(list(coords), list(quads)), quad_corners(mesh.coords, mesh.quads))
+            self.assertEqual(len(coords) // 3, mesh.num_verts())
+
+    def test_winding(self):
+        maze = make_maze(width=23, height=17)
+        coords, quads = mesh_tools.grid_quads(maze)
+        mesh = mesh_tools.QuadMesh(0, 0)
+        mesh.coords, mesh.quads = coords.tolist(), quads.tolist()
+        check_winding(self, maze, mesh)
+
+    def test_regions(self):
+        maze = make_maze(width=23, height=17)
+        for region in mesh_tools.chunk_ranges(maze.width, maze.height, 6):
+            mesh = mesh_tools.maze_quads(maze, region=region)
+            coords, quads = mesh_tools.grid_quads(maze, region)
+            self.assertEqual(quad_corners(list(coords), list(quads)), quad_corners(mesh.coords, mesh.quads))
+
+    def test_regions_share_paths(self):
+        maze = make_maze(width=23, height=17)
+        paths = maze.as_array() != 0
+        for region in mesh_tools.chunk_ranges(maze.width, maze.height, 6):
+            coords, quads = mesh_tools.grid_quads(maze, region, paths=paths)
+            expected_coords, expected_quads = mesh_tools.grid_quads(maze, region)
+            self.assertEqual((coords.tolist(), quads.tolist()), (expected_coords.tolist(), expected_quads.tolist()))
+
+    @staticmethod
+    def closed_test_mazes():
+        mazes = [make_maze(width=23, height=17)]
+
+        # random spaces, so walls often only touch at a corner
+        rng = random.Random(0)
+        maze = maze_tools.MAZE_STORAGE['BYTES'](12, 9)
+        for x in range(12):
+            for y in range(9):
+                if rng.random() < 0.5:
+                    maze.make_path(x, y)
+        mazes.append(maze)
+
+        # both diagonals of walls, no paths, and no walls
+        for diagonal in (((0, 0), (1, 1)), ((1, 0), (0, 1))):
+            maze = maze_tools.MAZE_STORAGE['BYTES'](2, 2)
+            for x, y in diagonal:
+                maze.make_path(x, y)
+            mazes.append(maze)
+        mazes.append(maze_tools.MAZE_STORAGE['BYTES'](4, 3))
+        maze = maze_tools.MAZE_STORAGE['BYTES'](4, 3)
+        for x in range(4):
+            for y in range(3):
+                maze.make_path(x, y)
+        mazes.append(maze)
+        return mazes
+
+    def test_closed_manifold(self):
+        for maze in self.closed_test_mazes():
+            for region in ((0, 0, maze.width, maze.height), (1, 1, maze.width, maze.height)):
+                coords, quads = mesh_tools.grid_quads(maze, region, closed=True)
+                quads = quads.tolist()
+
+                # every edge is used once in each direction, so it has exactly two faces wound the same way
+                edges = Counter()
+                for q in range(0, len(quads), 4):
+                    quad = quads[q:q + 4]
+                    for v1, v2 in zip(quad, quad[1:] + quad[:1]):
+                        edges[(v1, v2)] += 1
+                self.assertEqual(set(edges.values()), {1})
+                self.assertTrue(all((v2, v1) in edges for v1, v2 in edges))
+
+                # every vertex is used, and its faces make one fan around it (no walls pinched at a corner)
+                self.assertEqual(set(quads), set(range(len(coords) // 3)))
+                fans = {}
+                for q in range(0, len(quads), 4):
+                    quad = quads[q:q + 4]
+                    for corner in range(4):
+                        # each face around a vertex leads from the vertex before it to the vertex after it
+                        fans.setdefault(quad[corner], {})[quad[corner - 1]] = quad[(corner + 1) % 4]
+                for fan in fans.values():
+                    start = vert = next(iter(fan))
+                    steps = 0
+                    while True:
+                        vert = fan[vert]
+                        steps += 1
+                        if vert == start:
+                            break
+                    self.assertEqual(steps, len(fan))
+
+    def test_closed_volume(self):
+        for maze in self.closed_test_mazes():
+            coords, quads = mesh_tools.grid_quads(maze, closed=True, base=0.25)
+            verts = coords.reshape(-1, 3).astype(float).tolist()
+            quads = quads.tolist()
+
+            # signed volume of the triangles of each quad with the origin, positive if the faces point out
+            volume = 0
+            for q in range(0, len(quads), 4):
+                v = [verts[i] for i in quads[q:q + 4]]
+                for a, b, c in ((v[0], v[1], v[2]), (v[0], v[2], v[3])):
+                    volume += (a[0] * (b[1] * c[2] - b[2] * c[1]) - a[1] * (b[0] * c[2] - b[2] * c[0]) +
+                               a[2] * (b[0] * c[1] - b[1] * c[0])) / 6
+
+            walls = sum(not maze.is_path(x, y) for x in range(maze.width) for y in range(maze.height))
+            self.assertAlmostEqual(volume, maze.width * maze.height * 0.25 + walls, places=4)
+
+    def test_closed_keeps_visible_quads(self):
+        maze = make_maze(width=23, height=17)
+        coords, quads = mesh_tools.grid_quads(maze)
+        closed_coords, closed_quads = mesh_tools.grid_quads(maze, closed=True)
+        self.assertLessEqual(quad_corners(list(coords), list(quads)),
+                             quad_corners(list(closed_coords), list(closed_quads)))
+
+    def test_speed(self):
+        maze = maze_tools.KruskalsMaze(debug=False, width=501, height=501, storage='BYTES', seed=0).maze
+
+        clock = Clock("cells")
+        mesh = mesh_tools.maze_quads(maze)
+        cells_time = clock.stop("cells")
+
+        clock = Clock("grid")
+        coords, quads = mesh_tools.grid_quads(maze)
+        grid_time = clock.stop("grid")
+
+        report("501x501 maze: {} quads in {:.3f}s per space, {} quads in {:.3f}s with array operations",
+               mesh.num_quads(), cells_time, len(quads) // 4, grid_time)
+        self.assertEqual(len(quads) // 4, mesh.num_quads())
+        self.assertLess(grid_time, cells_time)
+
+
+class TestDupliVertCoords(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_instances_land_on_spaces(self):
+        spaces = [(3, 5), (0, 0), (7, 2), (4, 9)]
+        for rotation in (0, 90, 180, 270):
+            origin, coords = mesh_tools.dupli_vert_coords(spaces, rotation)
+            self.assertEqual(origin, (3, -5, 0))
+
+            # the emitter's rotation turns each vertex back onto its space
+            angle = math.radians(rotation)
+            for i, (x, y) in enumerate(spaces):
+                vx, vy = coords[i * 3], coords[i * 3 + 1]
+                world_x = origin[0] + vx * math.cos(angle) - vy * math.sin(angle)
+                world_y = origin[1] + vx * math.sin(angle) + vy * math.cos(angle)
+                self.assertAlmostEqual(world_x, x, places=4)
+                self.assertAlmostEqual(world_y, -y, places=4)
+
+
+@unittest.skipIf(mesh_tools.np is None, "numpy is not installed")
+class TestPlaceTiles(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_place_tile_coords(self):
+        coords = [(0.5, 0.0, 0.0), (0.0, 0.25, 1.0)]
+        placed = mesh_tools.place_tile_coords(coords, [(2, 3), (4, 0)], 90)
+        expected = [(2, -2.5, 0), (1.75, -3, 1), (4, 0.5, 0), (3.75, 0, 1)]
+        self.assertEqual(placed.shape, (4, 3))
+        for vert, expected_vert in zip(placed.tolist(), expected):
+            for a, b in zip(vert, expected_vert):
+                self.assertAlmostEqual(a, b, places=5)
+
+    def test_no_rotation(self):
+        placed = mesh_tools.place_tile_coords([(0.1, 0.2, 0.3)], [(5, 7)], 0)
+        self.assertEqual([round(a, 5) for a in placed.ravel().tolist()], [5.1, -6.8, 0.3])
+
+    def test_repeat_indices(self):
+        self.assertEqual(mesh_tools.repeat_indices([0, 1, 2, 2, 3, 0], 3, 4).tolist(),
+                         [0, 1, 2, 2, 3, 0, 4, 5, 6, 6, 7, 4, 8, 9, 10, 10, 11, 8])
+        self.assertEqual(mesh_tools.repeat_indices([0, 3], 2, 6, 10).tolist(), [10, 13, 16, 19])
+
+
+if __name__ == "__main__":
+    unittest.main()
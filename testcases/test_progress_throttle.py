@@ -0,0 +1,84 @@
+# Copyright 2017 Integrity Software and Games, LLC
+#
+# ##### BEGIN GPL LICENSE BLOCK ######
+# This file is part of UltiMaze.
+#
+# UltiMaze is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# UltiMaze is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+import unittest
+
+from progress_throttle import ThrottledProgress
+
+
+class StubProgress(ThrottledProgress):
+    """Records reports instead of sending them anywhere, with a clock that only moves when told to."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.reports = []
+        self.now = 0.0
+        self.clock_reads = 0
+        self.clock = self.read_clock
+
+    def read_clock(self):
+        self.clock_reads += 1
+        return self.now
+
+    def report(self, progress):
+        self.reports.append(progress)
+
+
+class TestThrottledProgress(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_reports_whole_percents(self):
+        progress = StubProgress()
+        for i in range(100001):
+            progress.update(i / 100000)
+
+        # once per whole percent, from 0% to 100%
+        self.assertEqual(len(progress.reports), 101)
+        self.assertEqual(progress.num_skipped(), 100001 - 101)
+
+    def test_clock_read_every_n_updates(self):
+        progress = StubProgress(check_every=100)
+        for i in range(100000):
+            progress.update(i / 100000)
+
+        # once per percent change, plus once every 100 updates within a percent
+        self.assertLessEqual(progress.clock_reads, 100 + 100000 // 100)
+
+    def test_reports_after_interval(self):
+        progress = StubProgress(interval=0.1, check_every=10)
+        progress.update(0.5)
+        for i in range(20):
+            progress.update(0.501)
+        self.assertEqual(len(progress.reports), 1)
+
+        # same percent, but enough time has passed
+        progress.now = 0.2
+        for i in range(10):
+            progress.update(0.502)
+        self.assertEqual(progress.reports, [0.5, 0.502])
+
+    def test_ignores_over_100_percent(self):
+        progress = StubProgress()
+        progress.update(1.5)
+        self.assertEqual(progress.reports, [])
+        self.assertEqual(progress.num_updates, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
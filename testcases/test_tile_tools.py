@@ -0,0 +1,155 @@
+# Copyright 2017 Integrity Software and Games, LLC
+#
+# ##### BEGIN GPL LICENSE BLOCK ######
+# This file is part of UltiMaze.
+#
+# UltiMaze is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# UltiMaze is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+import unittest
+
+import maze_tools
+import tile_tools
+from benchmarks import report
+from clock import Clock
+
+MODES = ('TWELVE_TILES', 'SIX_TILES')
+
+
+def make_maze(width=15, height=11, seed=0, storage='LIST'):
+    maze = maze_tools.KruskalsMaze(debug=False, width=width, height=height, storage=storage, seed=seed).maze
+    # a few loops and open areas so every kind of tile shows up
+    for x, y in ((1, 2), (2, 1), (3, 2), (5, 4), (6, 5), (5, 6)):
+        maze.make_path(x, y)
+    return maze
+
+
+def expected_placements(maze, tile_mode):
+    placements = {}
+    for x in range(maze.width):
+        for y in range(maze.height):
+            tile, rotation = tile_tools.choose_tile(maze, x, y, tile_mode)
+            if tile:
+                placements.setdefault((tile, rotation), []).append((x, y))
+    return placements
+
+
+class TestTables(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_tables_full(self):
+        for table in (tile_tools.FLOOR_TABLE, tile_tools.WALL_TABLE, tile_tools.SIX_TABLE):
+            self.assertEqual(len(table), 16)
+            self.assertNotIn(None, table)
+
+    def test_table_matches_dict(self):
+        for directions, tile in tile_tools.FLOOR_TILES.items():
+            self.assertEqual(tile_tools.FLOOR_TABLE[maze_tools.dirs_to_mask(directions)], tile)
+
+    def test_tile_names(self):
+        for mode, tiles in (('TWELVE_TILES', (tile_tools.FLOOR_TILES, tile_tools.WALL_TILES)),
+                            ('SIX_TILES', (tile_tools.SIX_TILES,))):
+            used = {tile for possibilities in tiles for tile, rotation in possibilities.values()}
+            self.assertEqual(used, set(tile_tools.TILE_NAMES[mode]))
+
+
+class TestChooseTile(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_twelve_tiles(self):
+        maze = maze_tools.Maze(3, 3)
+        for x, y in ((1, 0), (1, 1), (1, 2), (2, 1)):
+            maze.make_path(x, y)
+        # path with paths N, E, and S
+        self.assertEqual(tile_tools.choose_tile(maze, 1, 1, 'TWELVE_TILES'), ('floor_3_sided', 90))
+        # wall with paths N and E
+        self.assertEqual(tile_tools.choose_tile(maze, 0, 0, 'TWELVE_TILES'), ('wall_1_sided', 90))
+
+    def test_six_tiles_only_even_paths(self):
+        maze = maze_tools.Maze(3, 3)
+        for x, y in ((0, 0), (1, 0), (2, 0), (1, 1)):
+            maze.make_path(x, y)
+        self.assertEqual(tile_tools.choose_tile(maze, 0, 0, 'SIX_TILES'), ('dead_end', 90))
+        self.assertEqual(tile_tools.choose_tile(maze, 1, 0, 'SIX_TILES'), ("", 0))
+        self.assertEqual(tile_tools.choose_tile(maze, 2, 2, 'SIX_TILES'), ("", 0))
+
+
+class TestClassifyTiles(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_same_as_choose_tile(self):
+        for storage in maze_tools.MAZE_STORAGE:
+            maze = make_maze(storage=storage)
+            for mode in MODES:
+                names = tile_tools.TILE_NAMES[mode]
+                ids, rotations = tile_tools.classify_tiles(maze, mode)
+                for x in range(maze.width):
+                    for y in range(maze.height):
+                        tile, rotation = tile_tools.choose_tile(maze, x, y, mode)
+                        if tile:
+                            self.assertEqual((names[ids[x][y]], rotations[x][y]), (tile, rotation))
+                        else:
+                            self.assertEqual(ids[x][y], -1)
+
+    def test_placements(self):
+        maze = make_maze()
+        for mode in MODES:
+            placements = tile_tools.tile_placements(maze, mode)
+            expected = expected_placements(maze, mode)
+            self.assertEqual({key: sorted(spaces) for key, spaces in placements.items()}, expected)
+
+    def test_regions(self):
+        maze = make_maze()
+        for mode in MODES:
+            classified = tile_tools.classify_tiles(maze, mode)
+            whole = tile_tools.tile_placements(maze, mode)
+            combined = {}
+            for region in ((0, 0, 8, 6), (0, 6, 8, 11), (8, 0, 15, 6), (8, 6, 15, 11)):
+                x0, y0, x1, y1 = region
+                for key, spaces in tile_tools.tile_placements(maze, mode, region, classified).items():
+                    self.assertTrue(all(x0 <= x < x1 and y0 <= y < y1 for x, y in spaces))
+                    combined.setdefault(key, []).extend(spaces)
+            self.assertEqual({key: sorted(spaces) for key, spaces in combined.items()},
+                             {key: sorted(spaces) for key, spaces in whole.items()})
+
+    def test_without_numpy(self):
+        maze = make_maze()
+        np = tile_tools.np
+        tile_tools.np = None
+        try:
+            for mode in MODES:
+                self.assertEqual(tile_tools.tile_placements(maze, mode), expected_placements(maze, mode))
+        finally:
+            tile_tools.np = np
+
+    @unittest.skipIf(tile_tools.np is None, "numpy is not installed")
+    def test_speed(self):
+        maze = maze_tools.KruskalsMaze(debug=False, width=301, height=301, storage='BYTES', seed=0).maze
+
+        clock = Clock("per space")
+        expected = expected_placements(maze, 'TWELVE_TILES')
+        per_space_time = clock.stop("per space")
+
+        clock = Clock("tables")
+        placements = tile_tools.tile_placements(maze, 'TWELVE_TILES')
+        tables_time = clock.stop("tables")
+
+        report("301x301 tile classification: {:.3f}s per space, {:.3f}s with tables", per_space_time, tables_time)
+        self.assertEqual(sum(len(spaces) for spaces in placements.values()), 301 * 301)
+        self.assertEqual(set(placements), set(expected))
+        self.assertLess(tables_time, per_space_time)
+
+
+if __name__ == "__main__":
+    unittest.main()
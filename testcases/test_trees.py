@@ -20,7 +20,9 @@
 import unittest
 
 from trees import LoopInTreeError, RebelChildError
-from trees import Tree
+from trees import Tree, DisjointSet
+from benchmarks import report
+from clock import Clock
 
 
 def add_adam_nodes(tree):
@@ -593,5 +595,82 @@ class TestLoopingDependenciesCheck(unittest.TestCase):
             tree.check_for_bad_dependencies()
 
 
+class TestDisjointSet(unittest.TestCase):
+    maxDiff = 10000
+
+    def test_new_sets(self):
+        sets = DisjointSet(5)
+        self.assertEqual(len(sets), 5)
+        self.assertEqual(sets.num_sets, 5)
+        self.assertEqual([sets.find(a) for a in range(5)], [0, 1, 2, 3, 4])
+
+    def test_union(self):
+        sets = DisjointSet(5)
+        self.assertTrue(sets.union(0, 1))
+        self.assertTrue(sets.union(3, 4))
+        self.assertTrue(sets.union(1, 4))
+        self.assertFalse(sets.union(0, 3))
+
+        self.assertEqual(sets.num_sets, 2)
+        self.assertTrue(sets.same_set(0, 4))
+        self.assertFalse(sets.same_set(2, 3))
+
+    def test_add(self):
+        sets = DisjointSet(2)
+        self.assertEqual(sets.add(), 2)
+        sets.union(0, 2)
+
+        self.assertEqual(len(sets), 3)
+        self.assertTrue(sets.same_set(0, 2))
+
+    def test_groups(self):
+        sets = DisjointSet(6)
+        sets.union(0, 4)
+        sets.union(5, 1)
+        sets.union(4, 1)
+        groups = sets.groups()
+
+        self.assertEqual(sorted(groups.values()), [[0, 1, 4, 5], [2], [3]])
+        for root, nodes in groups.items():
+            self.assertTrue(all(sets.find(a) == root for a in nodes))
+
+    def test_path_compression(self):
+        sets = DisjointSet(4)
+        # never access sets.parents outside of test cases!
+        sets.parents[1] = 0
+        sets.parents[2] = 1
+        sets.parents[3] = 2
+
+        self.assertEqual(sets.find(3), 0)
+        self.assertEqual(list(sets.parents), [0, 0, 0, 0])
+
+    def test_speed_vs_tree(self):
+        """Merges one growing set with single nodes the way KruskalsMaze used to with Tree.
+
+        Parenting the big set's root to the new node makes the Tree one long chain, so every get_root(0) walks all of it.
+        """
+        num = 3000
+
+        clock = Clock("Tree")
+        tree = Tree()
+        for a in range(num):
+            tree.new_node(a)
+        for a in range(1, num):
+            if tree.get_root(0) != tree.get_root(a):
+                tree.parent(tree.get_root(0), tree.get_root(a))
+        tree_time = clock.stop("Tree")
+
+        clock = Clock("DisjointSet")
+        sets = DisjointSet(num)
+        for a in range(1, num):
+            sets.union(0, a)
+        sets_time = clock.stop("DisjointSet")
+
+        report("Union of {} nodes: Tree {:.4f} seconds, DisjointSet {:.4f} seconds", num, tree_time, sets_time)
+
+        self.assertEqual(sets.num_sets, 1)
+        self.assertLess(sets_time, tree_time)
+
+
 if __name__ == "__main__":
     unittest.main()
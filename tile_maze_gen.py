@@ -22,70 +22,72 @@ Tile-based maze generation.
 
 Available Functions:
     console_prog - Displays progress in the console
+    evaluate_tiles - Returns each tile's mesh with its modifiers applied, evaluated once per tile type
     add_tile - Adds a tile object to the scene at certain transform
-    choose_tile - Chooses what tile to add based on surrounding spaces in maze
+    add_tile_instances - Adds linked instances of a tile at many spaces with one dupliverts emitter
+    read_tile_mesh - Reads a tile's mesh data into numpy arrays
+    tiles_needing_join - Returns the tiles with data that add_merged_tiles can't copy
+    add_merged_tiles - Adds one mesh object with every placed tile written straight into it
+    add_tile_chunk - Adds one merged object with the tiles of one region of the maze
     make_tile_maze - Makes tile-based maze
 """
 import math
+from time import time
 
 import bpy
+import bmesh
+from mathutils import Matrix
 
+from . import mesh_tools
+from . import prep_manager
+from . import tile_tools
 from .progress_display import BlenderProgress
+from .mesh_tools import dupli_vert_coords, place_tile_coords, repeat_indices, chunk_ranges
 from .addon_name import get_addon_name
+from .logging_setup import setup_logger
 
+logger = setup_logger(__name__)
 
-def add_tile(tile, x_location, y_location, rotation):
+
+def evaluate_tiles(sources, scene=None):
+    """Returns each tile's mesh with its modifiers applied, evaluated once per tile type.
+
+    The meshes are temporary: remove them with bpy.data.meshes.remove when done placing tiles.
+
+    Args:
+        sources - (dict) {tile: tile object} (see prep_manager.resolve_tiles)
+        scene - scene to evaluate the modifiers in, the current scene by default
+
+    Returns:
+        (dict) {tile: mesh}
+    """
+    if scene is None:
+        scene = bpy.context.scene
+
+    return {tile: source.to_mesh(scene, True, 'PREVIEW') for tile, source in sources.items()}
+
+
+def add_tile(source, x_location, y_location, rotation, scene=None, mesh=None):
     """Adds a tile object to the scene at certain transform.
 
     Args:
-        tile - tile to add
+        source - tile object to copy (see prep_manager.resolve_tiles)
         location - location component of desired transform
         rotation - rotation component of desired transform
+        scene - scene to add the tile to, the current scene by default
+        mesh - mesh to give the copy instead of the source's, with the source's modifiers already applied to it
+               (see evaluate_tiles), the copy's modifiers are removed
     """
-    objects = bpy.context.scene.objects
-
-    # 12 tile gen
-    if tile == 'wall_4_sided':
-        copy = objects['wall_4_sided'].copy()
-    elif tile == 'wall_3_sided':
-        copy = objects['wall_3_sided'].copy()
-    elif tile == 'wall_2_sided':
-        copy = objects['wall_2_sided'].copy()
-    elif tile == 'wall_1_sided':
-        copy = objects['wall_1_sided'].copy()
-    elif tile == 'wall_0_sided':
-        copy = objects['wall_0_sided'].copy()
-    elif tile == 'wall_corner':
-        copy = objects['wall_corner'].copy()
-    elif tile == 'floor_4_sided':
-        copy = objects['floor_4_sided'].copy()
-    elif tile == 'floor_3_sided':
-        copy = objects['floor_3_sided'].copy()
-    elif tile == 'floor_2_sided':
-        copy = objects['floor_2_sided'].copy()
-    elif tile == 'floor_1_sided':
-        copy = objects['floor_1_sided'].copy()
-    elif tile == 'floor_0_sided':
-        copy = objects['floor_0_sided'].copy()
-    elif tile == 'floor_corner':
-        copy = objects['floor_corner'].copy()
-    # 6 tile gen
-    elif tile == 'four_way':
-        copy = objects['four_way'].copy()
-    elif tile == 't_int':
-        copy = objects['t_int'].copy()
-    elif tile == 'turn':
-        copy = objects['turn'].copy()
-    elif tile == 'dead_end':
-        copy = objects['dead_end'].copy()
-    elif tile == 'straight':
-        copy = objects['straight'].copy()
-    elif tile == 'no_path':
-        copy = objects['no_path'].copy()
+    if scene is None:
+        scene = bpy.context.scene
 
     # duplicate and move
-    scene = bpy.context.scene
-    copy.data = copy.data.copy()
+    copy = source.copy()
+    if mesh is None:
+        copy.data = copy.data.copy()
+    else:
+        copy.data = mesh.copy()
+        copy.modifiers.clear()
     scene.objects.link(copy)
     copy['MazeGeneratorDoNotTouch'] = True
     scene.objects.active = copy
@@ -95,105 +97,266 @@ def add_tile(tile, x_location, y_location, rotation):
     copy.rotation_euler[2] = math.radians(rotation)
 
 
-def choose_tile(maze, x, y):
-    """Chooses what tile to add based on surrounding spaces in maze.
+def add_tile_instances(source, rotation, spaces):
+    """Adds linked instances of a tile at many spaces with one dupliverts emitter.
+
+    The emitter is a vertex-only mesh with a vertex on every space, and a linked duplicate of the tile (sharing its
+    mesh data and modifiers) is parented to it, so the object count only grows with the number of tile types and
+    rotations instead of the number of spaces.
+
+    Args:
+        source - tile object to instance (see prep_manager.resolve_tiles)
+        rotation - rotation of every instance in degrees
+        spaces - (list of tuples) (x, y) spaces to add the tile at
 
     Returns:
-        tile name, rotation tile should have
+        the emitter object
     """
-    # find out how many spaces that are touching are paths
-    directions = maze.find_touching_path_dirs(x, y)
-
-    tm = bpy.context.scene.mg.tile_mode
-
-    if tm == "TWELVE_TILES":
-
-        floor_possibilities = {
-            # four-way floor
-            ('N', 'W', 'E', 'S'): ('floor_4_sided', 0),
-            # three-way floor
-            ('W', 'E', 'S'): ('floor_3_sided', 180),
-            ('N', 'E', 'S'): ('floor_3_sided', 90),
-            ('N', 'W', 'E'): ('floor_3_sided', 0),
-            ('N', 'W', 'S'): ('floor_3_sided', 270),
-            # dead-end floor
-            ('S',): ('floor_1_sided', 180),
-            ('E',): ('floor_1_sided', 90),
-            ('N',): ('floor_1_sided', 0),
-            ('W',): ('floor_1_sided', 270),
-            # solitary floor
-            (): ('floor_0_sided', 0),
-            # straight path floor
-            ('N', 'S'): ('floor_2_sided', 0),
-            ('W', 'E'): ('floor_2_sided', 90),
-            # turn floor
-            ('E', 'S'): ('floor_corner', 90),
-            ('N', 'E'): ('floor_corner', 0),
-            ('N', 'W'): ('floor_corner', 270),
-            ('W', 'S'): ('floor_corner', 180),
-        }
-
-        wall_possibilities = {
-            # solitary wall
-            ('N', 'W', 'E', 'S'): ('wall_4_sided', 0),
-            # end of wall
-            ('W', 'E', 'S'): ('wall_3_sided', 180),
-            ('N', 'E', 'S'): ('wall_3_sided', 90),
-            ('N', 'W', 'E'): ('wall_3_sided', 0),
-            ('N', 'W', 'S'): ('wall_3_sided', 270),
-            # side of wall block
-            ('S',): ('wall_1_sided', 180),
-            ('E',): ('wall_1_sided', 90),
-            ('N',): ('wall_1_sided', 0),
-            ('W',): ('wall_1_sided', 270),
-            # center of wall block
-            (): ('wall_0_sided', 0),
-            # straight wall between two paths
-            ('N', 'S'): ('wall_2_sided', 0),
-            ('W', 'E'): ('wall_2_sided', 90),
-            # corner wall
-            ('E', 'S'): ('wall_corner', 90),
-            ('N', 'E'): ('wall_corner', 0),
-            ('N', 'W'): ('wall_corner', 270),
-            ('W', 'S'): ('wall_corner', 180),
-        }
-
-        if maze.exist_test(x, y) and maze.is_path(x, y):
-            return floor_possibilities[tuple(directions)]
-        else:
-            return wall_possibilities[tuple(directions)]
-
-    elif tm == 'SIX_TILES':
-
-        possibilities = {
-            # four-way floor
-            ('N', 'W', 'E', 'S'): ('four_way', 0),
-            # three-way floor
-            ('W', 'E', 'S'): ('t_int', 180),
-            ('N', 'E', 'S'): ('t_int', 90),
-            ('N', 'W', 'E'): ('t_int', 0),
-            ('N', 'W', 'S'): ('t_int', 270),
-            # dead-end floor
-            ('S',): ('dead_end', 180),
-            ('E',): ('dead_end', 90),
-            ('N',): ('dead_end', 0),
-            ('W',): ('dead_end', 270),
-            # solitary wall
-            (): ('no_path', 0),
-            # straight path floor
-            ('N', 'S'): ('straight', 0),
-            ('W', 'E'): ('straight', 90),
-            # turn floor
-            ('E', 'S'): ('turn', 90),
-            ('N', 'E'): ('turn', 0),
-            ('N', 'W'): ('turn', 270),
-            ('W', 'S'): ('turn', 180),
-        }
-        # to add in six tile mode the space must be a path and it's x and y must both be even
-        if maze.exist_test(x, y) and maze.is_path(x, y) and not x & 1 and not y & 1:
-            return possibilities[tuple(directions)]
-        else:
-            return "", 0  # empty tile to show not to add anything
+    scene = bpy.context.scene
+
+    location, coords = dupli_vert_coords(spaces, rotation)
+    me = bpy.data.meshes.new("{}.{}".format(source.name, rotation))
+    me.vertices.add(len(spaces))
+    me.vertices.foreach_set("co", coords)
+    me.update()
+
+    emitter = bpy.data.objects.new("Maze.{}.{}".format(source.name, rotation), me)
+    emitter.location = location
+    emitter.rotation_euler[2] = math.radians(rotation)
+    emitter.dupli_type = 'VERTS'
+    scene.objects.link(emitter)
+
+    # linked duplicate at the emitter's origin (keeping the tile's height)...takes the emitter's rotation as its parent
+    child = source.copy()
+    child.location = (0, 0, source.location[2])
+    child.rotation_euler[2] = 0
+    child.parent = emitter
+    scene.objects.link(child)
+
+    return emitter
+
+
+def read_tile_mesh(tile, apply_modifiers):
+    """Reads a tile's mesh data into numpy arrays.
+
+    The mesh is read once per tile (with its modifiers evaluated if apply_modifiers) and has the tile's scale, x and
+    y rotation, and z location applied, so only the z rotation and x and y location of each copy are left to
+    place_tile_coords.
+
+    Args:
+        tile - tile object
+        apply_modifiers - (bool) evaluate the tile's modifiers
+
+    Returns:
+        (dict) 'coords', 'loop_start', 'loop_total', 'vertex_index', 'material_index', 'use_smooth', 'uv',
+               'edge_vertices', 'use_edge_sharp', 'use_seam', and 'crease' numpy arrays and 'materials', the tile's
+               list of materials
+    """
+    np = mesh_tools.np
+    scene = bpy.context.scene
+    me = tile.to_mesh(scene, apply_modifiers, 'PREVIEW')
+
+    rotation = tile.rotation_euler.copy()
+    rotation[2] = 0
+    scale = Matrix.Identity(4)
+    for i in range(3):
+        scale[i][i] = tile.scale[i]
+    # tiles keep their own height like the copies add_tile makes
+    height = Matrix.Translation((0, 0, tile.location[2]))
+    me.transform(height * rotation.to_matrix().to_4x4() * scale)
+
+    num_verts = len(me.vertices)
+    num_loops = len(me.loops)
+    num_polys = len(me.polygons)
+    num_edges = len(me.edges)
+
+    data = {'coords': np.empty(num_verts * 3, dtype=np.float32),
+            'loop_start': np.empty(num_polys, dtype=np.int32),
+            'loop_total': np.empty(num_polys, dtype=np.int32),
+            'vertex_index': np.empty(num_loops, dtype=np.int32),
+            'material_index': np.empty(num_polys, dtype=np.int32),
+            'use_smooth': np.empty(num_polys, dtype=np.bool_),
+            'uv': np.zeros(num_loops * 2, dtype=np.float32),
+            'edge_vertices': np.empty(num_edges * 2, dtype=np.int32),
+            'use_edge_sharp': np.empty(num_edges, dtype=np.bool_),
+            'use_seam': np.empty(num_edges, dtype=np.bool_),
+            'crease': np.empty(num_edges, dtype=np.float32),
+            'materials': [slot.material for slot in tile.material_slots]}
+
+    me.vertices.foreach_get("co", data['coords'])
+    me.polygons.foreach_get("loop_start", data['loop_start'])
+    me.polygons.foreach_get("loop_total", data['loop_total'])
+    me.loops.foreach_get("vertex_index", data['vertex_index'])
+    me.polygons.foreach_get("material_index", data['material_index'])
+    me.polygons.foreach_get("use_smooth", data['use_smooth'])
+    if me.uv_layers.active is not None:
+        me.uv_layers.active.data.foreach_get("uv", data['uv'])
+    me.edges.foreach_get("vertices", data['edge_vertices'])
+    me.edges.foreach_get("use_edge_sharp", data['use_edge_sharp'])
+    me.edges.foreach_get("use_seam", data['use_seam'])
+    me.edges.foreach_get("crease", data['crease'])
+
+    bpy.data.meshes.remove(me)
+    return data
+
+
+def tiles_needing_join(sources):
+    """Returns the tiles with data that add_merged_tiles can't copy.
+
+    Merged meshes get the tile's geometry, materials, smooth shading, edge flags, and active UV map. Vertex groups,
+    shape keys, vertex colors, and extra UV maps are only kept by joining copies of the tile objects.
+
+    Args:
+        sources - (dict) {tile: tile object} (see prep_manager.resolve_tiles)
+
+    Returns:
+        (list) sorted names of the tiles that need the join path
+    """
+    tiles = []
+    for tile, obj in sources.items():
+        me = obj.data
+        if obj.vertex_groups or me.shape_keys is not None or me.vertex_colors or len(me.uv_layers) > 1:
+            tiles.append(tile)
+    return sorted(tiles)
+
+
+def add_merged_tiles(placements, sources, apply_modifiers=True, remove_doubles=True, name="Maze", tile_data=None):
+    """Adds one mesh object with every placed tile written straight into it.
+
+    Each tile's mesh is read once (see read_tile_mesh), then all of its copies are transformed with array operations
+    and written into one preallocated mesh, so no per-tile objects, modifier_apply calls, or object joins are needed.
+
+    Args:
+        placements - (dict) {(tile, rotation): [(x, y) spaces]}
+        sources - (dict) {tile: tile object} (see prep_manager.resolve_tiles)
+        apply_modifiers - (bool) evaluate each tile's modifiers
+        remove_doubles - (bool) merge the copies' overlapping vertices with bmesh
+        name - (string) name of the new object and mesh
+        tile_data - (dict) optional {tile: read_tile_mesh data} already read, so many calls can share the reads;
+                    tiles missing from it are read and added to it
+
+    Returns:
+        the new object
+    """
+    np = mesh_tools.np
+    time_start = time()
+
+    if tile_data is None:
+        tile_data = {}
+    tiles = sorted({tile for tile, rotation in placements})
+    for tile in tiles:
+        if tile not in tile_data:
+            tile_data[tile] = read_tile_mesh(sources[tile], apply_modifiers)
+
+    # every tile's material slots mapped onto one list of materials
+    materials = []
+    for tile in tiles:
+        slots = []
+        for material in tile_data[tile]['materials']:
+            if material not in materials:
+                materials.append(material)
+            slots.append(materials.index(material))
+        tile_data[tile]['material_map'] = np.array(slots or [0], dtype=np.int32)
+
+    coords, loop_start, loop_total, vertex_index, material_index, use_smooth, uv = [], [], [], [], [], [], []
+    edge_vertices, use_edge_sharp, use_seam, crease = [], [], [], []
+    num_verts = 0
+    num_loops = 0
+    for (tile, rotation), spaces in placements.items():
+        data = tile_data[tile]
+        copies = len(spaces)
+        tile_verts = len(data['coords']) // 3
+        tile_loops = len(data['vertex_index'])
+
+        coords.append(place_tile_coords(data['coords'].reshape(-1, 3), spaces, rotation).ravel())
+        vertex_index.append(repeat_indices(data['vertex_index'], copies, tile_verts, num_verts))
+        loop_start.append(repeat_indices(data['loop_start'], copies, tile_loops, num_loops))
+        loop_total.append(np.tile(data['loop_total'], copies))
+        material_index.append(np.tile(data['material_map'][data['material_index']], copies))
+        use_smooth.append(np.tile(data['use_smooth'], copies))
+        uv.append(np.tile(data['uv'], copies))
+        edge_vertices.append(repeat_indices(data['edge_vertices'], copies, tile_verts, num_verts))
+        use_edge_sharp.append(np.tile(data['use_edge_sharp'], copies))
+        use_seam.append(np.tile(data['use_seam'], copies))
+        crease.append(np.tile(data['crease'], copies))
+
+        num_verts += tile_verts * copies
+        num_loops += tile_loops * copies
+
+    num_polys = sum(len(a) for a in loop_total)
+    num_edges = sum(len(a) for a in use_seam)
+
+    me = bpy.data.meshes.new(name)
+    me.vertices.add(num_verts)
+    me.edges.add(num_edges)
+    me.loops.add(num_loops)
+    me.polygons.add(num_polys)
+
+    me.vertices.foreach_set("co", np.concatenate(coords))
+    me.loops.foreach_set("vertex_index", np.concatenate(vertex_index))
+    me.polygons.foreach_set("loop_start", np.concatenate(loop_start))
+    me.polygons.foreach_set("loop_total", np.concatenate(loop_total))
+    me.polygons.foreach_set("material_index", np.concatenate(material_index))
+    me.polygons.foreach_set("use_smooth", np.concatenate(use_smooth))
+
+    # the tiles' edges are added up front so their flags are kept, calc_edges only links the loops to them
+    me.edges.foreach_set("vertices", np.concatenate(edge_vertices))
+    me.edges.foreach_set("use_edge_sharp", np.concatenate(use_edge_sharp))
+    me.edges.foreach_set("use_seam", np.concatenate(use_seam))
+    me.edges.foreach_set("crease", np.concatenate(crease))
+
+    me.uv_textures.new()
+    me.uv_layers[0].data.foreach_set("uv", np.concatenate(uv))
+
+    for material in materials:
+        me.materials.append(material)
+
+    me.update(calc_edges=True)
+
+    if remove_doubles:
+        bm = bmesh.new()
+        bm.from_mesh(me)
+        bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0001)
+        bm.to_mesh(me)
+        bm.free()
+
+    scene = bpy.context.scene
+    ob = bpy.data.objects.new(name, me)
+    scene.objects.link(ob)
+    scene.objects.active = ob
+    ob.select = True
+
+    logger.debug("Merged {} tiles into {} ({} verts, {} faces) in {:.3f}s".format(
+        sum(len(spaces) for spaces in placements.values()), name, num_verts, num_polys, time() - time_start))
+    return ob
+
+
+def add_tile_chunk(maze, region, size, sources, classified, tile_data, apply_modifiers=True, remove_doubles=True):
+    """Adds one merged object with the tiles of one region of the maze.
+
+    Each region can be rebuilt on its own by calling this again with the same region, its object is named after the
+    region's position in the grid of chunks ("Maze.chunk_x_y").
+
+    Args:
+        maze - maze to place tiles on
+        region - (tuple) (x0, y0, x1, y1) spaces of the maze in the chunk (see mesh_tools.chunk_ranges)
+        size - (int) width and height of every chunk in spaces
+        sources - (dict) {tile: tile object} (see prep_manager.resolve_tiles)
+        classified - (tuple) (ids, rotations) of the whole maze (see tile_tools.classify_tiles)
+        tile_data - (dict) {tile: read_tile_mesh data} shared by every chunk
+        apply_modifiers - (bool) evaluate each tile's modifiers
+        remove_doubles - (bool) merge the copies' overlapping vertices with bmesh
+
+    Returns:
+        the new object, None if no tiles are placed in the region
+    """
+    placements = tile_tools.tile_placements(maze, bpy.context.scene.mg.tile_mode, region, classified)
+    if not placements:
+        return None
+
+    x0, y0 = region[:2]
+    name = "Maze.chunk_{}_{}".format(x0 // size, y0 // size)
+    return add_merged_tiles(placements, sources, apply_modifiers, remove_doubles, name, tile_data)
 
 
 def make_tile_maze(maze):
@@ -210,35 +373,78 @@ def make_tile_maze(maze):
 
     bpy.ops.object.select_all(action='DESELECT')
 
+    # instances share the tile's modifiers, so there is nothing to apply or merge
+    use_instances = mg.instance_tiles and not mg.merge_objects
+    # merged tiles are written straight into one mesh (needs numpy, otherwise tiles are copied then joined)
+    use_merged_mesh = mg.merge_objects and mesh_tools.np is not None
+
     bldr_prog = BlenderProgress("Tile Maze Gen", debug)
     bldr_prog.start()
-    genloops = 0
-    for row in range(maze.height):
-        for column in range(maze.width):
-            tile, rotation = choose_tile(maze, column, row)
-            if tile:
-                add_tile(tile, column, row, rotation)
-
-            genloops += 1
-            progress = genloops / (maze.width * maze.height)
-            bldr_prog.update(progress)
+
+    # tile objects looked up once for the whole maze
+    sources = prep_manager.resolve_tiles()
+
+    if mg.merge_objects and mesh_tools.np is None:
+        logger.warning("numpy isn't available, tiles will be copied then joined into one object")
+    elif use_merged_mesh:
+        # data the merged mesh would drop is only kept by joining copies of the tiles
+        join_tiles = tiles_needing_join(sources)
+        if join_tiles:
+            logger.warning("Tiles {} have vertex groups, shape keys, vertex colors, or extra UV maps, tiles will be "
+                           "copied then joined into one object".format(", ".join(join_tiles)))
+            use_merged_mesh = False
+
+    if use_merged_mesh and mg.chunked_mesh:
+        # one merged object per region, built one at a time so only one region's arrays are held at once...every
+        # chunk is left selected (like the single merged object) so the maze is moved to the 3D cursor afterwards
+        classified = tile_tools.classify_tiles(maze, mg.tile_mode)
+        tile_data = {}
+        regions = list(chunk_ranges(maze.width, maze.height, mg.chunk_size))
+        for i, region in enumerate(regions):
+            add_tile_chunk(maze, region, mg.chunk_size, sources, classified, tile_data, mg.apply_modifiers,
+                           mg.remove_doubles_merge)
+            bldr_prog.update((i + 1) / len(regions))
+    else:
+        # every space classified at once, grouped by tile and rotation
+        placements = tile_tools.tile_placements(maze, mg.tile_mode)
+
+        if use_merged_mesh:
+            add_merged_tiles(placements, sources, mg.apply_modifiers, mg.remove_doubles_merge)
+        elif use_instances:
+            for (tile, rotation), spaces in placements.items():
+                add_tile_instances(sources[tile], rotation, spaces)
+        else:
+            # modifiers are evaluated once per tile type instead of applied on every copy
+            evaluated = evaluate_tiles(sources, scene) if mg.apply_modifiers else {}
+
+            num_tiles = sum(len(spaces) for spaces in placements.values())
+            genloops = 0
+            for (tile, rotation), spaces in placements.items():
+                source = sources[tile]
+                mesh = evaluated.get(tile)
+                for column, row in spaces:
+                    add_tile(source, column, row, rotation, scene, mesh)
+
+                    genloops += 1
+                    bldr_prog.update(genloops / num_tiles)
+
+            for mesh in evaluated.values():
+                bpy.data.meshes.remove(mesh)
+
     scene.update()
     bldr_prog.finish()
 
+    if use_merged_mesh:
+        return
+
+    if use_instances:
+        bpy.ops.object.select_all(action='DESELECT')
+        return
+
     for obj in scene.objects:
         if obj.get("MazeGeneratorDoNotTouch"):
             obj.select = True
 
-    if mg.apply_modifiers:
-        for obj in bpy.context.selected_objects:
-            scene.objects.active = obj
-            mod_list = obj.modifiers.values()
-            for modifier in mod_list:
-                name = modifier.name
-                bpy.ops.object.modifier_apply(apply_as='DATA', modifier=name)
-    else:
-        scene.objects.active = bpy.context.object
-
     if mg.merge_objects:
         bpy.ops.object.join()
 
@@ -0,0 +1,271 @@
+# Copyright 2017 Integrity Software and Games, LLC
+#
+# ##### BEGIN GPL LICENSE BLOCK ######
+# This file is part of UltiMaze.
+#
+# UltiMaze is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# UltiMaze is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with UltiMaze.  If not, see <http://www.gnu.org/licenses/>.
+# ##### END GPL LICENSE BLOCK #####
+
+"""
+Chooses which tile (and rotation) goes on each space of a tile-based maze without touching bpy.
+
+Every space's neighbors are packed into a 4-bit mask (see maze_tools.DIR_BITS) which indexes a 16-entry table for
+the tile mode, so the whole maze can be classified at once.
+
+Available Functions:
+    make_table - Returns a 16-entry list of (tile, rotation) indexed by neighbor mask
+    choose_tile - Returns the tile and rotation for one space
+    classify_tiles - Returns the tile ids and rotations of every space in the maze
+    tile_placements - Returns the spaces to place each tile and rotation at
+"""
+
+IN_BLENDER = True
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if IN_BLENDER:
+    from .maze_tools import dirs_to_mask
+else:
+    from maze_tools import dirs_to_mask
+
+FLOOR_TILES = {
+    # four-way floor
+    ('N', 'W', 'E', 'S'): ('floor_4_sided', 0),
+    # three-way floor
+    ('W', 'E', 'S'): ('floor_3_sided', 180),
+    ('N', 'E', 'S'): ('floor_3_sided', 90),
+    ('N', 'W', 'E'): ('floor_3_sided', 0),
+    ('N', 'W', 'S'): ('floor_3_sided', 270),
+    # dead-end floor
+    ('S',): ('floor_1_sided', 180),
+    ('E',): ('floor_1_sided', 90),
+    ('N',): ('floor_1_sided', 0),
+    ('W',): ('floor_1_sided', 270),
+    # solitary floor
+    (): ('floor_0_sided', 0),
+    # straight path floor
+    ('N', 'S'): ('floor_2_sided', 0),
+    ('W', 'E'): ('floor_2_sided', 90),
+    # turn floor
+    ('E', 'S'): ('floor_corner', 90),
+    ('N', 'E'): ('floor_corner', 0),
+    ('N', 'W'): ('floor_corner', 270),
+    ('W', 'S'): ('floor_corner', 180),
+}
+
+WALL_TILES = {
+    # solitary wall
+    ('N', 'W', 'E', 'S'): ('wall_4_sided', 0),
+    # end of wall
+    ('W', 'E', 'S'): ('wall_3_sided', 180),
+    ('N', 'E', 'S'): ('wall_3_sided', 90),
+    ('N', 'W', 'E'): ('wall_3_sided', 0),
+    ('N', 'W', 'S'): ('wall_3_sided', 270),
+    # side of wall block
+    ('S',): ('wall_1_sided', 180),
+    ('E',): ('wall_1_sided', 90),
+    ('N',): ('wall_1_sided', 0),
+    ('W',): ('wall_1_sided', 270),
+    # center of wall block
+    (): ('wall_0_sided', 0),
+    # straight wall between two paths
+    ('N', 'S'): ('wall_2_sided', 0),
+    ('W', 'E'): ('wall_2_sided', 90),
+    # corner wall
+    ('E', 'S'): ('wall_corner', 90),
+    ('N', 'E'): ('wall_corner', 0),
+    ('N', 'W'): ('wall_corner', 270),
+    ('W', 'S'): ('wall_corner', 180),
+}
+
+SIX_TILES = {
+    # four-way floor
+    ('N', 'W', 'E', 'S'): ('four_way', 0),
+    # three-way floor
+    ('W', 'E', 'S'): ('t_int', 180),
+    ('N', 'E', 'S'): ('t_int', 90),
+    ('N', 'W', 'E'): ('t_int', 0),
+    ('N', 'W', 'S'): ('t_int', 270),
+    # dead-end floor
+    ('S',): ('dead_end', 180),
+    ('E',): ('dead_end', 90),
+    ('N',): ('dead_end', 0),
+    ('W',): ('dead_end', 270),
+    # solitary wall
+    (): ('no_path', 0),
+    # straight path floor
+    ('N', 'S'): ('straight', 0),
+    ('W', 'E'): ('straight', 90),
+    # turn floor
+    ('E', 'S'): ('turn', 90),
+    ('N', 'E'): ('turn', 0),
+    ('N', 'W'): ('turn', 270),
+    ('W', 'S'): ('turn', 180),
+}
+
+# every tile of each mode, tile ids are indices into these
+TILE_NAMES = {
+    'TWELVE_TILES': ('wall_4_sided', 'wall_3_sided', 'wall_2_sided', 'wall_1_sided', 'wall_0_sided', 'wall_corner',
+                     'floor_4_sided', 'floor_3_sided', 'floor_2_sided', 'floor_1_sided', 'floor_0_sided',
+                     'floor_corner'),
+    'SIX_TILES': ('four_way', 't_int', 'turn', 'dead_end', 'straight', 'no_path'),
+}
+
+
+def make_table(tiles):
+    """Returns a 16-entry list of (tile, rotation) indexed by neighbor mask.
+
+    Args:
+        tiles - (dict) {(directions): (tile, rotation)} with every combination of directions
+    """
+    table = [None] * 16
+    for directions, tile in tiles.items():
+        table[dirs_to_mask(directions)] = tile
+    return table
+
+
+FLOOR_TABLE = make_table(FLOOR_TILES)
+WALL_TABLE = make_table(WALL_TILES)
+SIX_TABLE = make_table(SIX_TILES)
+
+
+def choose_tile(maze, x, y, tile_mode, mask=None):
+    """Returns the tile and rotation for one space.
+
+    Args:
+        maze - maze to choose for
+        x - (int) x coordinate of the space
+        y - (int) y coordinate of the space
+        tile_mode - (string) 'TWELVE_TILES' or 'SIX_TILES'
+        mask - (int) optional neighbor mask of the space if it is already known
+
+    Returns:
+        tile name, rotation tile should have (("", 0) if no tile goes on the space)
+    """
+    if mask is None:
+        mask = dirs_to_mask(maze.find_touching_path_dirs(x, y))
+
+    is_path = maze.exist_test(x, y) and maze.is_path(x, y)
+    if tile_mode == 'TWELVE_TILES':
+        return FLOOR_TABLE[mask] if is_path else WALL_TABLE[mask]
+
+    elif tile_mode == 'SIX_TILES':
+        # to add in six tile mode the space must be a path and it's x and y must both be even
+        if is_path and not x & 1 and not y & 1:
+            return SIX_TABLE[mask]
+
+    return "", 0  # empty tile to show not to add anything
+
+
+def id_tables(tile_mode):
+    """Returns (floor ids, floor rotations, wall ids, wall rotations) 16-entry lists for tile_mode (-1 = no tile)."""
+    names = TILE_NAMES[tile_mode]
+    if tile_mode == 'TWELVE_TILES':
+        floors, walls = FLOOR_TABLE, WALL_TABLE
+    else:
+        floors, walls = SIX_TABLE, [("", 0)] * 16
+
+    def ids(table):
+        return [names.index(tile) if tile else -1 for tile, rotation in table]
+
+    def rotations(table):
+        return [rotation for tile, rotation in table]
+
+    return ids(floors), rotations(floors), ids(walls), rotations(walls)
+
+
+def classify_tiles(maze, tile_mode):
+    """Returns the tile ids and rotations of every space in the maze.
+
+    With numpy, the neighbor masks of the whole maze are found at once (see maze_tools.Maze.neighbor_mask) and
+    mapped through the mode's tables with array indexing.
+
+    Args:
+        maze - maze to classify
+        tile_mode - (string) 'TWELVE_TILES' or 'SIX_TILES'
+
+    Returns:
+        ids - (width x height numpy array or list of lists, indexed [x][y]) index of each space's tile in
+              TILE_NAMES[tile_mode], -1 for spaces without a tile
+        rotations - (same shape as ids) rotation of each space's tile in degrees
+    """
+    floor_ids, floor_rots, wall_ids, wall_rots = id_tables(tile_mode)
+
+    if np is not None:
+        masks = maze.neighbor_mask()
+        paths = maze.as_array() != 0
+        if tile_mode == 'SIX_TILES':
+            # only even spaces get tiles in six tile mode
+            even = np.zeros(paths.shape, dtype=bool)
+            even[::2, ::2] = True
+            paths = paths & even
+
+        ids = np.where(paths, np.array(floor_ids)[masks], np.array(wall_ids)[masks])
+        rotations = np.where(paths, np.array(floor_rots)[masks], np.array(wall_rots)[masks])
+        return ids, rotations
+
+    ids = []
+    rotations = []
+    for x in range(maze.width):
+        column_ids = []
+        column_rots = []
+        for y in range(maze.height):
+            mask = dirs_to_mask(maze.find_touching_path_dirs(x, y))
+            if maze.is_path(x, y) and (tile_mode == 'TWELVE_TILES' or (not x & 1 and not y & 1)):
+                column_ids.append(floor_ids[mask])
+                column_rots.append(floor_rots[mask])
+            else:
+                column_ids.append(wall_ids[mask])
+                column_rots.append(wall_rots[mask])
+        ids.append(column_ids)
+        rotations.append(column_rots)
+    return ids, rotations
+
+
+def tile_placements(maze, tile_mode, region=None, classified=None):
+    """Returns the spaces to place each tile and rotation at.
+
+    Args:
+        maze - maze to classify
+        tile_mode - (string) 'TWELVE_TILES' or 'SIX_TILES'
+        region - (tuple) optional (x0, y0, x1, y1) part of the maze to place tiles in, the whole maze by default
+        classified - (tuple) optional (ids, rotations) from classify_tiles, so the maze is only classified once
+                     when placing it one region at a time
+
+    Returns:
+        (dict) {(tile, rotation): [(x, y) spaces]} for every tile and rotation used in the maze (or region)
+    """
+    names = TILE_NAMES[tile_mode]
+    ids, rotations = classified if classified is not None else classify_tiles(maze, tile_mode)
+    x0, y0, x1, y1 = region if region is not None else (0, 0, maze.width, maze.height)
+    placements = {}
+
+    if np is not None:
+        # one group per (id, rotation) pair, each group's spaces found with a single nonzero()
+        ids = ids[x0:x1, y0:y1]
+        keys = ids * 360 + rotations[x0:x1, y0:y1]
+        for key in np.unique(keys[ids >= 0]).tolist():
+            tile_id, rotation = divmod(key, 360)
+            xs, ys = np.nonzero(keys == key)
+            placements[(names[tile_id], rotation)] = list(zip((xs + x0).tolist(), (ys + y0).tolist()))
+        return placements
+
+    for x in range(x0, x1):
+        for y in range(y0, y1):
+            if ids[x][y] >= 0:
+                placements.setdefault((names[ids[x][y]], rotations[x][y]), []).append((x, y))
+    return placements
@@ -19,6 +19,8 @@
 
 IN_BLENDER = True
 
+from array import array
+
 if IN_BLENDER:
     from .logging_setup import setup_logger
 else:
@@ -266,6 +268,85 @@ class Tree:
         self.nodes[parent]['children'] = set()
 
 
+class DisjointSet:
+    """Union-find over the nodes 0 to size - 1, stored in flat integer arrays.
+
+    Unlike Tree, this only answers "which set is this node in?", but it does so in nearly constant time thanks to
+    path compression in find() and union by rank in union().
+
+    Methods:
+        __init__ - Makes every node its own set.
+        __len__ - Override for python len(), returns the number of nodes.
+        add - Adds a new node in its own set and returns it.
+        find - Returns the root (set id) of node.
+        union - Merges the sets of a and b, returns False if they were already the same set.
+        same_set - Returns True if a and b are in the same set.
+        groups - Returns {root: [nodes in root's set]} built in a single pass over the nodes.
+    """
+    def __init__(self, size=0):
+        """Makes every node its own set."""
+        self.parents = array('l', range(size))
+        self.ranks = array('B', bytes(size))
+        self.num_sets = size
+
+    def __len__(self):
+        """Override for python len(), returns the number of nodes."""
+        return len(self.parents)
+
+    def add(self):
+        """Adds a new node in its own set and returns it."""
+        node = len(self.parents)
+        self.parents.append(node)
+        self.ranks.append(0)
+        self.num_sets += 1
+        return node
+
+    def find(self, node):
+        """Returns the root (set id) of node."""
+        parents = self.parents
+        root = node
+        while parents[root] != root:
+            root = parents[root]
+
+        # path compression...point everything we walked over straight at the root
+        while parents[node] != root:
+            parents[node], node = root, parents[node]
+
+        return root
+
+    def union(self, a, b):
+        """Merges the sets of a and b, returns False if they were already the same set."""
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return False
+
+        # union by rank...hang the shallower tree under the deeper one
+        if self.ranks[root_a] < self.ranks[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parents[root_b] = root_a
+        if self.ranks[root_a] == self.ranks[root_b]:
+            self.ranks[root_a] += 1
+
+        self.num_sets -= 1
+        return True
+
+    def same_set(self, a, b):
+        """Returns True if a and b are in the same set."""
+        return self.find(a) == self.find(b)
+
+    def groups(self):
+        """Returns {root: [nodes in root's set]} built in a single pass over the nodes."""
+        groups = {}
+        for node in range(len(self.parents)):
+            root = self.find(node)
+            if root in groups:
+                groups[root].append(node)
+            else:
+                groups[root] = [node]
+        return groups
+
+
 def main():
     tree = Tree()
     tree.new_node(name='root')
@@ -28,12 +28,17 @@ Available Functions:
                         height
     str_list_maze - Converts a python maze into a text block
     convert_list_maze - Convert text maze into a Python list maze
+    read_pixels - Reads all of an image's pixels at once
+    write_pixels - Writes all of an image's pixels at once
 """
 
+from time import time
+
 import bpy
 
+from . import image_tools
 from . import prep_manager
-from .maze_tools import Maze
+from .maze_tools import storage_class
 from .progress_display import BlenderProgress
 from .time_display import TimeDisplay
 from .logging_setup import setup_logger
@@ -134,7 +139,7 @@ def convert_list_maze():
     x_dim = mg.mg_width
     y_dim = mg.mg_height
 
-    maze = Maze(x_dim, y_dim)
+    maze = storage_class(mg.layout_storage)(x_dim, y_dim)
     for y in range(maze.height):
         for x in range(maze.width):
             index = y * maze.width + x
@@ -151,6 +156,44 @@ def convert_list_maze():
     return maze
 
 
+def read_pixels(image):
+    """Reads all of an image's pixels at once.
+
+    Uses a single foreach_get into a numpy buffer where Blender has it (2.83+), otherwise a single slice of
+    image.pixels, instead of going through RNA once per value.
+
+    Args:
+        image - image data block
+
+    Returns:
+        flat RGBA buffer, rows bottom to top (numpy array or tuple of floats)
+    """
+    np = image_tools.np
+    if np is not None and hasattr(image.pixels, "foreach_get"):
+        pixels = np.empty(len(image.pixels), dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        return pixels
+    return image.pixels[:]
+
+
+def write_pixels(image, pixels):
+    """Writes all of an image's pixels at once.
+
+    Uses a single foreach_set where Blender has it (2.83+), otherwise a single slice assignment to image.pixels,
+    so the image buffer is only updated once instead of once per value.
+
+    Args:
+        image - image data block
+        pixels - flat RGBA buffer, rows bottom to top (numpy array or list of floats, see image_tools.text_to_pixels)
+    """
+    if hasattr(image.pixels, "foreach_set"):
+        image.pixels.foreach_set(pixels)
+    elif hasattr(pixels, "tolist"):
+        image.pixels[:] = pixels.tolist()
+    else:
+        image.pixels[:] = pixels
+
+
 class ConvertMazeImageMG(bpy.types.Operator):
     bl_label = "Image to Text"
     bl_idname = "maze_gen.convert_maze_image"
@@ -190,8 +233,9 @@ class ConvertMazeImageMG(bpy.types.Operator):
             return {'CANCELLED'}
 
         # size of the images in the UV/Image editor
-        x_dim = bpy.data.images[mg.maze_image].size[0]
-        y_dim = bpy.data.images[mg.maze_image].size[1]
+        image = bpy.data.images[mg.maze_image]
+        x_dim = image.size[0]
+        y_dim = image.size[1]
         
         # warn the user if the image dimensions are not the same as the maze
         maze_width = bpy.context.scene.mg.mg_width
@@ -206,35 +250,14 @@ class ConvertMazeImageMG(bpy.types.Operator):
                                                       maze_height
                                                      ))
 
-        maze = ""
-        count = 0
-        
-        # iterate over all pixels while making one long line for the maze str
-        while count < len(bpy.data.images[mg.maze_image].pixels):
+        time_start = time()
 
-            # if value is white, its a path, otherwise a wall
-            # more specifically, if the red channel's value is > 0.5
-            if bpy.data.images[mg.maze_image].pixels[count] > 0.5:
-                maze += "1"
-            else:
-                maze += "0"
+        # every pixel read at once, then thresholded (red channel > 0.5 is a path) and flipped to text row order
+        maze = image_tools.pixels_to_text(read_pixels(image), x_dim, y_dim)
 
-            # factor in RGBA channels for each real pixel
-            count += 4
+        logger.debug("Converted {}x{} image to text in {:.3f}s".format(x_dim, y_dim, time() - time_start))
 
-        # the maze at this point is a mirror of what it should be
-        flipped_maze = ""
-        row = (y_dim - 1)
-        while row >= 0:
-            # snippet from exist test (here for reference only)
-            #            index = (x + (y * (x_dimensions)))
-
-            maze_row = maze[(row * x_dim):(row * x_dim + x_dim)]
-            flipped_maze += maze_row
-
-            row -= 1
-
-        text_block_name = write_to_text_img(flipped_maze, x_dim, y_dim)
+        text_block_name = write_to_text_img(maze, x_dim, y_dim)
 
         self.report({'INFO'}, "See '" + str(text_block_name) +
                     "' in the text editor")
@@ -296,32 +319,13 @@ class CreateImageFromListMG(bpy.types.Operator):
             width=mg.mg_width,
             height=mg.mg_height)
 
-        image_row = mg.mg_height - 1
-        count = 0
-        while image_row >= 0:
-            image_col = 0
-            while image_col < mg.mg_width:
-                if str_list_maze[count] == "1":
-                    # Red Channel
-                    image_maze.pixels[(image_row * mg.mg_width * 4 +
-                                       image_col * 4 + 0)] = 1
-                    # Green Channel
-                    image_maze.pixels[(image_row * mg.mg_width * 4 +
-                                       image_col * 4 + 1)] = 1
-                    # Blue Channel
-                    image_maze.pixels[(image_row * mg.mg_width * 4 +
-                                       image_col * 4 + 2)] = 1
-                    # Alpha Channel
-                    image_maze.pixels[(image_row * mg.mg_width * 4 +
-                                       image_col * 4 + 3)] = 1
-
-                # report progress if changed
-                progress = count / area
-                bldr_prog.update(progress)
-
-                image_col += 1
-                count += 1
-            image_row -= 1
+        time_start = time()
+
+        # whole RGBA buffer built from the text (rows flipped to Blender's bottom to top order), then written once
+        write_pixels(image_maze, image_tools.text_to_pixels(str_list_maze, mg.mg_width, mg.mg_height))
+
+        logger.debug("Converted {}x{} text to image in {:.3f}s".format(mg.mg_width, mg.mg_height,
+                                                                      time() - time_start))
 
         bldr_prog.finish()
         time_disp = TimeDisplay()
@@ -20,7 +20,7 @@
 """WEIghted RAndom Number Generator aka WeiRa"""
 
 
-from random import random
+import random
 
 
 def unpack(list_items):
@@ -29,12 +29,12 @@ def unpack(list_items):
     return items, weights
 
 
-def weira_choice(list_items):
-    """list_items = [[item1, prob], [item2, prob], ...]"""
+def weira_choice(list_items, rng=random):
+    """list_items = [[item1, prob], [item2, prob], ...], rng = random.Random or the random module"""
     items, weights = unpack(list_items)
     
     factor = sum(weights)
-    rand = random()
+    rand = rng.random()
     val = round(rand * factor)
     
     i = 0
@@ -44,9 +44,9 @@ def weira_choice(list_items):
         i += 1
 
 
-def weira_shuffle(list_items, bias):
+def weira_shuffle(list_items, bias, rng=random):
     items, weights = unpack(list_items)
-    weights = [bias * a + random() * max(weights) + min(weights) for a in weights]
+    weights = [bias * a + rng.random() * max(weights) + min(weights) for a in weights]
 
     ordered_list = [x for (y, x) in sorted(zip(weights, items), key=lambda pair: pair[0])]
 